@@ -2,13 +2,22 @@
 Home page: URL input and web scraping. Save to SQLite after confirmation.
 """
 import streamlit as st
+import json
 import sys
+import time
 import pandas as pd
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).resolve().parent))
-from db.database import insert_company
-from app_cache import init_db_once, clear_companies_cache
+from db import database
+from db.database import content_hash, upsert_companies
+from functions import simhash
+from functions.scraper import MAX_CONCURRENCY
+from app_cache import get_crawl_worker, init_db_once
+
+# Discover and scrape run as background jobs; while one is active the page reruns this often to show progress.
+POLL_SECONDS = 1.5
+ACTIVE_STATUSES = (database.JOB_PENDING, database.JOB_RUNNING)
 
 
 def _str(val):
@@ -17,6 +26,55 @@ def _str(val):
         return ""
     return str(val).strip()
 
+
+SCRAPED_COLS = ["company_name", "description", "contact_email", "contact_phone", "contact_address", "has_contact_form", "source_url"]
+SCRAPED_ROW_LABELS = ["Company name", "Description", "Contact email", "Contact phone", "Contact address", "Has contact form", "Source URL"]
+
+
+def _vertical_df(results):
+    """Table with rows = fields, columns = Record 1, Record 2, ..."""
+    data_by_field = [[_str(r.get(c)) for r in results] for c in SCRAPED_COLS]
+    return pd.DataFrame(
+        {f"Record {i+1}": [data_by_field[j][i] for j in range(len(SCRAPED_COLS))] for i in range(len(results))},
+        index=SCRAPED_ROW_LABELS,
+    )
+
+
+def _tracked_job(key):
+    """
+    The job whose id is stored under key in session state. Once it has ended the key is dropped,
+    so its outcome is handled on exactly one run.
+    """
+    job_id = st.session_state.get(key)
+    if job_id is None:
+        return None
+    job = database.get_crawl_job(job_id)
+    if job is None or job["status"] not in ACTIVE_STATUSES:
+        del st.session_state[key]
+    return job
+
+
+def _open_job(kind, job_id):
+    st.session_state["discover_job" if kind == database.JOB_DISCOVER else "scrape_job"] = job_id
+
+
+def _jobs_panel():
+    """Recent background jobs, so results can be reopened after a browser refresh."""
+    jobs = database.list_crawl_jobs(limit=10)
+    if not jobs:
+        return
+    running = sum(1 for j in jobs if j["status"] in ACTIVE_STATUSES)
+    with st.expander(f"Background jobs ({running} running)"):
+        for j in jobs:
+            what_col, status_col, action_col = st.columns([5, 2, 1])
+            what_col.write(f"**{j['kind'].title()}** {j['start_url']}")
+            status_col.write(f"{j['status']} · {j['pages_saved']}/{j['pages_found']}")
+            if j["status"] in ACTIVE_STATUSES:
+                action_col.button("Cancel", key=f"cancel_job_{j['id']}", on_click=database.cancel_crawl_job, args=(j["id"],))
+            elif j["status"] == database.JOB_DONE:
+                action_col.button("Open", key=f"open_job_{j['id']}", on_click=_open_job, args=(j["kind"], j["id"]))
+
+
 st.set_page_config(page_title="IndigoNode", page_icon="🏠", layout="wide")
 st.markdown("""
 <style>
@@ -30,27 +88,70 @@ st.markdown("""
 st.title("IndigoNode – Web Scraping")
 
 init_db_once()
+polling = False
 
 url = st.text_input("URL", placeholder="https://example.com or https://example.com/page")
 
 mode = st.radio("Mode", ["Single page only", "Discover & choose pages", "Manual entry"], horizontal=True)
 max_pages = 50
+concurrency = 8
+use_sitemaps = True
+stop_when_complete = False
+dedupe_distance = None
 if "Discover" in mode:
-    max_pages = st.number_input("Max pages to discover", min_value=5, max_value=150, value=50, step=5)
+    pages_col, conc_col = st.columns(2)
+    with pages_col:
+        max_pages = st.number_input("Max pages to discover", min_value=5, max_value=150, value=50, step=5)
+    with conc_col:
+        concurrency = st.number_input("Concurrent requests", min_value=1, max_value=MAX_CONCURRENCY, value=8, step=1,
+                                      help="How many pages are fetched at the same time.")
+    use_sitemaps = st.checkbox("Use the site's sitemap when it has one", value=True,
+                               help="Lists pages from robots.txt / sitemap.xml instead of downloading every page to follow its links.")
+    stop_when_complete = st.checkbox("Stop once contact details are found", value=False,
+                                     help="Visits contact/about-style pages first and stops as soon as an email, phone, "
+                                          "address and contact form have been found. Only the visited pages are listed.")
+    dedupe_col, distance_col = st.columns(2)
+    with dedupe_col:
+        dedupe = st.checkbox("Skip near-duplicate pages", value=False,
+                             help="Leaves out pages whose text is almost the same as a page already crawled "
+                                  "(paginated listings, tag pages, print versions) instead of parsing them again. "
+                                  "Navigation, header and footer text is ignored, and contact/about-style pages "
+                                  "are always kept.")
+    with distance_col:
+        distance = st.number_input("Near-duplicate distance", min_value=0, max_value=10,
+                                   value=simhash.DEFAULT_MAX_DISTANCE, step=1, disabled=not dedupe,
+                                   help="How many bits (of 64) two page fingerprints may differ by and still count "
+                                        "as duplicates. 0 only skips pages with the same text.")
+    if dedupe:
+        dedupe_distance = int(distance)
 
 if "Discover" in mode:
+    worker = get_crawl_worker()
     if st.button("Discover pages"):
         if not url or not url.strip():
             st.error("Please enter a valid URL.")
         else:
-            try:
-                from functions.scraper import discover_site_urls
-                with st.spinner("Discovering pages on this site…"):
-                    discovered = discover_site_urls(url.strip(), max_pages=max_pages)
-                st.session_state["discovered_urls"] = discovered
-                st.success(f"Found {len(discovered)} page(s). Select the ones you want to scrape below.")
-            except Exception as e:
-                st.error(str(e))
+            st.session_state["discover_job"] = worker.submit(
+                database.JOB_DISCOVER, url.strip(),
+                {"max_pages": int(max_pages), "concurrency": int(concurrency), "use_sitemaps": use_sitemaps,
+                 "stop_when_complete": stop_when_complete, "dedupe_distance": dedupe_distance},
+                expected=int(max_pages),
+            )
+            st.session_state.pop("discovered_urls", None)
+
+    _jobs_panel()
+    job = _tracked_job("discover_job")
+    if job is not None:
+        if job["status"] in ACTIVE_STATUSES:
+            polling = True
+            st.info(f"Discovering pages on {job['start_url']}… {job['pages_saved']} found so far. "
+                    "The crawl runs in the background; you can keep using the app.")
+        elif job["status"] == database.JOB_DONE:
+            discovered = database.get_crawl_job_items(job["id"])
+            st.session_state["discovered_urls"] = discovered
+            st.success(f"Found {len(discovered)} page(s). Select the ones you want to scrape below.")
+        elif job["status"] == database.JOB_FAILED:
+            st.error(job["error"])
 
     if "discovered_urls" in st.session_state:
         discovered_urls = st.session_state["discovered_urls"]
@@ -78,38 +179,55 @@ if "Discover" in mode:
             if not selected:
                 st.warning("Select at least one page.")
             else:
-                from functions.scraper import scrape_urls
-                with st.spinner(f"Scraping {len(selected)} page(s)…"):
-                    results = scrape_urls(selected)
-                st.session_state["last_scraped_list"] = results
-                st.success(f"Scraped {len(results)} page(s). Review and save below.")
+                st.session_state["scrape_job"] = worker.submit(
+                    database.JOB_SCRAPE, selected[0],
+                    {"urls": selected, "concurrency": int(concurrency), "dedupe_distance": dedupe_distance},
+                    expected=len(selected),
+                )
+                st.session_state.pop("last_scraped_list", None)
+
+    job = _tracked_job("scrape_job")
+    if job is not None:
+        if job["status"] in ACTIVE_STATUSES:
+            polling = True
+            total = max(job["pages_found"], 1)
+            st.progress(min(job["pages_saved"] / total, 1.0),
+                        text=f"Scraped {job['pages_saved']} of {job['pages_found']} page(s)…")
+            partial = database.get_crawl_job_items(job["id"])
+            if partial:
+                st.dataframe(_vertical_df(partial), use_container_width=True)
+        elif job["status"] == database.JOB_DONE:
+            st.session_state["last_scraped_list"] = database.get_crawl_job_items(job["id"])
+            st.success(f"Scraped {job['pages_saved']} page(s). Review and save below.")
+            skipped = job["pages_found"] - job["pages_saved"]
+            if skipped > 0:
+                deduped = json.loads(job["params"]).get("dedupe_distance") is not None
+                st.caption(f"{skipped} page(s) were skipped: they could not be fetched"
+                           + (" or were near-duplicates of another page." if deduped else "."))
+        elif job["status"] == database.JOB_FAILED:
+            st.error(job["error"])
 
     if "last_scraped_list" in st.session_state:
         results = st.session_state["last_scraped_list"]
         st.subheader("Edit scraped data")
         st.caption("Fields are shown as rows; each column is one record. Edit any cell, then click **Save all to Database**.")
-        cols = ["company_name", "description", "contact_email", "contact_phone", "contact_address", "has_contact_form", "source_url"]
-        row_labels = ["Company name", "Description", "Contact email", "Contact phone", "Contact address", "Has contact form", "Source URL"]
-        # Build table: rows = fields, columns = Record 1, Record 2, ...
-        data_by_field = [[_str(r.get(c)) for r in results] for c in cols]
-        df_vertical = pd.DataFrame(
-            {f"Record {i+1}": [data_by_field[j][i] for j in range(len(cols))] for i in range(len(results))},
-            index=row_labels,
-        )
-        edited_df = st.data_editor(df_vertical, use_container_width=True, num_rows="fixed", key="edit_scraped_list")
+        edited_df = st.data_editor(_vertical_df(results), use_container_width=True, num_rows="fixed", key="edit_scraped_list")
         if st.button("Save all to Database"):
+            records = []
             for j, col in enumerate(edited_df.columns):
-                row_vals = [edited_df.iloc[i, j] for i in range(len(cols))]
-                insert_company(
-                    company_name=_str(row_vals[0]),
-                    description=_str(row_vals[1]),
-                    contact_email=_str(row_vals[2]),
-                    contact_phone=_str(row_vals[3]),
-                    contact_address=_str(row_vals[4]),
-                    has_contact_form=_str(row_vals[5]) or "No",
-                    source_url=_str(row_vals[6]),
-                )
-            clear_companies_cache()
+                row_vals = [edited_df.iloc[i, j] for i in range(len(SCRAPED_COLS))]
+                records.append({
+                    "company_name": _str(row_vals[0]),
+                    "description": _str(row_vals[1]),
+                    "contact_email": _str(row_vals[2]),
+                    "contact_phone": _str(row_vals[3]),
+                    "contact_address": _str(row_vals[4]),
+                    "has_contact_form": _str(row_vals[5]) or "No",
+                    "source_url": _str(row_vals[6]),
+                    # Hash of the page as scraped, so an unchanged re-scrape keeps these edits.
+                    "content_hash": content_hash(results[j]),
+                })
+            upsert_companies(records)
             st.success(f"Saved {len(edited_df.columns)} record(s) to database.")
             del st.session_state["last_scraped_list"]
             if "discovered_urls" in st.session_state:
@@ -130,16 +248,15 @@ elif "Manual" in mode:
         if not manual_company or not manual_company.strip():
             st.error("Company name is required.")
         else:
-            insert_company(
-                company_name=manual_company.strip(),
-                description=manual_description.strip() if manual_description else "",
-                contact_email=manual_email.strip() if manual_email else "",
-                contact_phone=manual_phone.strip() if manual_phone else "",
-                contact_address=manual_address.strip() if manual_address else "",
-                has_contact_form=manual_has_form,
-                source_url=manual_url.strip() if manual_url else "",
-            )
-            clear_companies_cache()
+            upsert_companies([{
+                "company_name": manual_company.strip(),
+                "description": manual_description.strip() if manual_description else "",
+                "contact_email": manual_email.strip() if manual_email else "",
+                "contact_phone": manual_phone.strip() if manual_phone else "",
+                "contact_address": manual_address.strip() if manual_address else "",
+                "has_contact_form": manual_has_form,
+                "source_url": manual_url.strip() if manual_url else "",
+            }])
             st.session_state["manual_save_success"] = True
     if st.session_state.get("manual_save_success"):
         st.success("We were able to save successfully.")
@@ -171,16 +288,20 @@ else:
             source_url = st.text_input("Source URL", value=data.get("source_url", ""))
             submitted = st.form_submit_button("Save to Database")
         if submitted:
-            insert_company(
-                company_name=(company_name or "").strip(),
-                description=(description or "").strip(),
-                contact_email=(contact_email or "").strip(),
-                contact_phone=(contact_phone or "").strip(),
-                contact_address=(contact_address or "").strip(),
-                has_contact_form=has_contact_form or "No",
-                source_url=(source_url or "").strip(),
-            )
-            clear_companies_cache()
+            upsert_companies([{
+                "company_name": (company_name or "").strip(),
+                "description": (description or "").strip(),
+                "contact_email": (contact_email or "").strip(),
+                "contact_phone": (contact_phone or "").strip(),
+                "contact_address": (contact_address or "").strip(),
+                "has_contact_form": has_contact_form or "No",
+                "source_url": (source_url or "").strip(),
+                "content_hash": content_hash(data),
+            }])
             st.success("Saved to database.")
             del st.session_state["last_scraped"]
             st.rerun()
+
+if polling:
+    time.sleep(POLL_SECONDS)
+    st.rerun()
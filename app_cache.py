@@ -1,9 +1,15 @@
 """
-Shared Streamlit cache for DB init and company list. Use get_cached_companies()
-everywhere; call clear_companies_cache() after insert/delete so other pages see fresh data.
+Shared Streamlit cache for DB init, company list and the background crawl worker.
+Use get_cached_companies() everywhere. The cached table follows the database change log: each
+read applies only the rows inserted, updated or deleted since the cached version, so writers no
+longer need to clear anything.
 """
+import threading
+
+import pandas as pd
 import streamlit as st
 from db import database
+from functions.crawl_worker import CrawlWorker
 
 
 @st.cache_resource
@@ -12,13 +18,46 @@ def init_db_once():
     database.init_db()
 
 
-@st.cache_data(ttl=300)
-def get_cached_companies():
-    """Cached companies DataFrame. Cleared on insert/delete so data stays fresh."""
+@st.cache_resource
+def get_crawl_worker() -> CrawlWorker:
+    """The process-wide worker that runs queued discover/scrape jobs, started on first use."""
     init_db_once()
-    return database.get_all_companies()
+    return CrawlWorker().start()
+
+
+@st.cache_resource
+def _companies_store() -> dict:
+    """Process-wide cached table: the DataFrame and the change version it reflects."""
+    return {"lock": threading.Lock(), "version": None, "df": None}
+
+
+def _apply_changes(df: pd.DataFrame, changed: pd.DataFrame, deleted: list[int]) -> pd.DataFrame:
+    """New frame with changed rows replaced/added and deleted ids dropped, in get_all_companies order."""
+    drop_ids = set(deleted).union(changed["id"]) if not changed.empty else set(deleted)
+    kept = df[~df["id"].isin(drop_ids)]
+    parts = [kept, changed] if not changed.empty else [kept]
+    patched = pd.concat(parts, ignore_index=True) if len(parts) > 1 else kept.reset_index(drop=True)
+    return patched.sort_values(["scraped_at", "id"], ascending=False, ignore_index=True)
 
 
-def clear_companies_cache():
-    """Call after inserting or deleting companies so Dashboard/Database show fresh data."""
-    get_cached_companies.clear()
+def get_cached_companies():
+    """
+    Cached companies DataFrame, brought up to date with one change-log query per call.
+    Columns use the compact dtypes of database.load_companies_snapshot (Arrow strings, a No/Yes
+    category, datetime scraped_at). The frame is shared between sessions and returned without
+    a copy: treat it as read-only.
+    """
+    init_db_once()
+    store = _companies_store()
+    with store["lock"]:
+        changes = None if store["df"] is None else database.get_changes_since(store["version"])
+        if changes is None:
+            store["version"], store["df"] = database.load_companies_snapshot()
+        elif changes[0] != store["version"]:
+            version, changed, deleted = changes
+            store["df"] = _apply_changes(store["df"], changed, deleted)
+            store["version"] = version
+        else:
+            return store["df"]
+        database.prune_changes(store["version"])
+        return store["df"]
@@ -0,0 +1,160 @@
+"""
+Headless batch scraping: discover and scrape every site listed in a file, saving straight to the database.
+
+    python batch_scrape.py urls.txt [--batch NAME] [--max-pages 50] [--sites 4] [--concurrency 8]
+                           [--no-sitemaps] [--until-contact] [--dedupe-distance N] [--parse-workers N]
+
+The file holds one start URL per line (blank lines and lines starting with # are ignored).
+Progress is checkpointed per start URL in the crawl_jobs table under the batch name
+(default: the file name), so running the same command again after a crash or Ctrl-C picks
+up the sites that were not finished. Pages are saved with upsert_companies, so a site that
+is crawled again does not create duplicate rows. Pages are parsed in --parse-workers
+processes (default: one per CPU core), shared by all sites being crawled. With
+--dedupe-distance, near-duplicate pages of a site (see functions/simhash.py) are neither
+parsed nor saved.
+"""
+import argparse
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from db import database
+from functions import fetcher, metrics, parse_pool, simhash
+from functions.scraper import DEFAULT_CONCURRENCY, discover_site_urls, iter_scrape_urls
+
+# Scraped records are written in batches of this size (one transaction each).
+SAVE_BATCH_SIZE = 50
+
+
+def read_start_urls(path: Path) -> list[str]:
+    """Start URLs from a text file, in file order, without blanks, comments or duplicates."""
+    urls = {}
+    for line in path.read_text(encoding="utf-8").splitlines():
+        line = line.strip()
+        if line and not line.startswith("#"):
+            urls.setdefault(line)
+    return list(urls)
+
+
+class _Stopped(Exception):
+    """Raised from discovery's on_url callback to abandon the current site once stop is set."""
+
+
+def crawl_site(start_url: str, max_pages: int, concurrency: int, stop: threading.Event,
+               use_sitemaps: bool = True, until_contact: bool = False,
+               dedupe_distance: int | None = None) -> tuple[int, int]:
+    """
+    Discover and scrape one site, saving as it goes. Returns (pages found, pages saved).
+    Setting stop ends discovery at the next URL it finds and scraping at the next page (0, 0 if
+    it was still discovering).
+    """
+    def check_stop(url: str) -> None:
+        if stop.is_set():
+            raise _Stopped()
+
+    try:
+        urls = discover_site_urls(start_url, max_pages=max_pages, concurrency=concurrency, use_sitemaps=use_sitemaps,
+                                  stop_when_complete=until_contact, dedupe_distance=dedupe_distance, on_url=check_stop)
+    except _Stopped:
+        return 0, 0
+    saved = 0
+    pending = []
+    for result in iter_scrape_urls(urls, concurrency=concurrency, dedupe_distance=dedupe_distance):
+        if stop.is_set():
+            break
+        pending.append(result)
+        if len(pending) >= SAVE_BATCH_SIZE:
+            saved += len(database.upsert_companies(pending))
+            pending = []
+    if pending:
+        saved += len(database.upsert_companies(pending))
+    return len(urls), saved
+
+
+def worker(batch: str, max_pages: int, concurrency: int, stop: threading.Event, use_sitemaps: bool = True,
+           until_contact: bool = False, dedupe_distance: int | None = None) -> None:
+    """Claim and run pending jobs of the batch until none are left or stop is set."""
+    while not stop.is_set():
+        job = database.claim_crawl_job(batch)
+        if job is None:
+            return
+        start = time.perf_counter()
+        try:
+            found, saved = crawl_site(job["start_url"], max_pages, concurrency, stop, use_sitemaps, until_contact,
+                                     dedupe_distance)
+        except Exception as e:
+            database.finish_crawl_job(job["id"], database.JOB_FAILED, error=str(e))
+            print(f"FAILED  {job['start_url']}: {e}", flush=True)
+            continue
+        if stop.is_set():
+            # Interrupted mid-site: hand the job back so the next run redoes it.
+            database.finish_crawl_job(job["id"], database.JOB_PENDING)
+            return
+        if saved == 0:
+            database.finish_crawl_job(job["id"], database.JOB_FAILED, pages_found=found, error="No page could be scraped")
+            print(f"FAILED  {job['start_url']}: no page could be scraped", flush=True)
+            continue
+        database.finish_crawl_job(job["id"], database.JOB_DONE, pages_found=found, pages_saved=saved)
+        print(f"done    {job['start_url']}: {saved}/{found} pages in {time.perf_counter() - start:.1f}s", flush=True)
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("url_file", type=Path, help="Text file with one start URL per line")
+    ap.add_argument("--batch", help="Job batch name (default: the file name)")
+    ap.add_argument("--max-pages", type=int, default=50, help="Pages to discover per site (default: 50)")
+    ap.add_argument("--sites", type=int, default=4, help="Sites crawled at the same time (default: 4)")
+    ap.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                    help=f"Concurrent requests per site (default: {DEFAULT_CONCURRENCY})")
+    ap.add_argument("--no-sitemaps", action="store_true", help="Always discover pages by following links")
+    ap.add_argument("--until-contact", action="store_true",
+                    help="Per site, stop crawling once an email, phone, address and contact form are found")
+    ap.add_argument("--dedupe-distance", type=int, metavar="N",
+                    help="Skip pages whose SimHash is within N bits (of 64) of a page already crawled on the site "
+                         f"(off by default; {simhash.DEFAULT_MAX_DISTANCE} suits most sites)")
+    ap.add_argument("--parse-workers", type=int, default=parse_pool.DEFAULT_WORKERS,
+                    help=f"Processes parsing fetched pages (default: {parse_pool.DEFAULT_WORKERS}, one per core)")
+    ap.add_argument("--retry-failed", action="store_true", help="Also retry sites that failed in an earlier run")
+    args = ap.parse_args()
+
+    batch = args.batch or args.url_file.name
+    # Nothing here reads the timings (they are shown by the app's Performance page), so skip recording them.
+    metrics.enabled = False
+    parse_pool.configure(args.parse_workers)
+    # Each site keeps up to --concurrency connections open to its host; --sites hosts are crawled at once.
+    fetcher.configure(pool_connections=max(fetcher.DEFAULT_POOL_CONNECTIONS, args.sites),
+                      pool_maxsize=max(1, args.concurrency))
+    database.init_db()
+    added = database.enqueue_crawl_jobs(batch, read_start_urls(args.url_file))
+    resumed = database.requeue_crawl_jobs(batch, include_failed=args.retry_failed)
+    counts = database.crawl_job_counts(batch)
+    print(f"batch {batch!r}: {added} new, {resumed} requeued, {counts.get(database.JOB_PENDING, 0)} to crawl, "
+          f"{counts.get(database.JOB_DONE, 0)} already done", flush=True)
+
+    stop = threading.Event()
+    pool = ThreadPoolExecutor(max_workers=max(1, args.sites))
+    futures = {pool.submit(worker, batch, args.max_pages, args.concurrency, stop, not args.no_sitemaps,
+                           args.until_contact, args.dedupe_distance) for _ in range(max(1, args.sites))}
+    try:
+        while futures:
+            # Short timeout keeps the main thread responsive to Ctrl-C.
+            done, futures = wait(futures, timeout=0.5, return_when=FIRST_COMPLETED)
+            for future in done:
+                future.result()  # surface unexpected worker errors
+    except KeyboardInterrupt:
+        print("Interrupted: finishing in-flight pages, unfinished sites will resume next run…", flush=True)
+        stop.set()
+        pool.shutdown(wait=True, cancel_futures=True)
+        return 130
+    pool.shutdown()
+
+    counts = database.crawl_job_counts(batch)
+    print(f"finished: {counts.get(database.JOB_DONE, 0)} done, {counts.get(database.JOB_FAILED, 0)} failed", flush=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
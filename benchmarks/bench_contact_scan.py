@@ -0,0 +1,115 @@
+"""
+Benchmark: contact scanning throughput on page text, functions.contact_scan.scan_text vs the
+unbounded EMAIL/PHONE/ADDRESS regexes it replaced (kept below as the reference).
+
+    python benchmarks/bench_contact_scan.py [--kb 2 16 64 256] [--repeat 3] [--legacy-limit-kb 2]
+
+Besides ordinary page text, it runs the inputs that make backtracking regexes blow up: long
+digit-and-space runs, long word runs with numbers in them and no street suffix, and long
+local-part runs with no "@". For each it prints MB/s at every size; a linear scanner keeps
+roughly the same MB/s as the input grows, a quadratic one drops by the size ratio. The run
+fails if scan_text's MB/s on the largest input falls below a quarter of its MB/s on the smallest.
+The reference is only timed up to --legacy-limit-kb: it needs tens of seconds for 4 KB of digit runs.
+"""
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from functions.contact_scan import scan_text
+
+# --- Reference: the regexes scraper.py used before contact_scan --------------------------
+
+LEGACY_EMAIL_REGEX = re.compile(r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}")
+LEGACY_PHONE_REGEX = re.compile(r"\+?[\d\s\-().]{10,}")
+LEGACY_ADDRESS_REGEX = re.compile(
+    r"\d+[\s\w.-]+(?:street|st|avenue|ave|blvd|boulevard|road|rd|drive|dr|way|lane|ln|court|ct)\.?\s*[,\s]*[\w\s.-]+",
+    re.I,
+)
+
+
+def legacy_scan(text: str) -> int:
+    """Everything the old extractors could match in text (all matches, to compare like for like)."""
+    found = 0
+    for regex in (LEGACY_EMAIL_REGEX, LEGACY_PHONE_REGEX, LEGACY_ADDRESS_REGEX):
+        found += sum(1 for _ in regex.finditer(text))
+    return found
+
+
+# --- Inputs --------------------------------------------------------------------------------
+
+WORDS = "lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor incididunt".split()
+
+
+def page_text(size: int, rng: random.Random) -> str:
+    """Filler prose with a contact sentence every ~2 KB, like the text of a real page."""
+    parts, length = [], 0
+    while length < size:
+        part = " ".join(rng.choice(WORDS) for _ in range(300))
+        part += (f" Call +1 ({rng.randint(200, 999)}) 555-{rng.randint(1000, 9999)} or write to "
+                 f"info@example{rng.randint(1, 99)}.com. Visit {rng.randint(1, 999)} Oak Street, Dayton OH 45402. ")
+        parts.append(part)
+        length += len(part)
+    return "".join(parts)[:size]
+
+
+def digit_runs(size: int, rng: random.Random) -> str:
+    return "".join(rng.choice("0123456789 ") for _ in range(size))
+
+
+def numbered_words(size: int, rng: random.Random) -> str:
+    return " ".join(f"{rng.randint(1, 999)} {rng.choice(WORDS)}" for _ in range(size // 8))[:size]
+
+
+def local_parts(size: int, rng: random.Random) -> str:
+    return "".join(rng.choice("abcdefghij.-_+") for _ in range(size))
+
+
+INPUTS = {
+    "page text": page_text,
+    "digit runs": digit_runs,
+    "numbered words": numbered_words,
+    "email local parts, no @": local_parts,
+}
+
+
+def mb_per_sec(fn, text: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(text)
+        best = min(best, time.perf_counter() - start)
+    return len(text) / 1_000_000 / best
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--kb", type=int, nargs="+", default=[2, 16, 64, 256], help="Input sizes")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--legacy-limit-kb", type=int, default=2, help="Largest input given to the reference regexes")
+    ap.add_argument("--seed", type=int, default=1)
+    args = ap.parse_args()
+
+    sizes = sorted(args.kb)
+    failed = []
+    print(f"{'input':<26}{'KB':>6}{'scan_text MB/s':>16}{'legacy MB/s':>14}")
+    for name, make in INPUTS.items():
+        rates = []
+        for kb in sizes:
+            text = make(kb * 1024, random.Random(args.seed))
+            rate = mb_per_sec(scan_text, text, args.repeat)
+            rates.append(rate)
+            legacy = f"{mb_per_sec(legacy_scan, text, 1):14.3f}" if kb <= args.legacy_limit_kb else f"{'-':>14}"
+            print(f"{name:<26}{kb:>6}{rate:16.2f}{legacy}")
+        if rates[-1] < rates[0] / 4:
+            failed.append(name)
+    if failed:
+        print(f"scan_text throughput fell with input size on: {', '.join(failed)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Benchmark: rows/sec saving scraped records one insert_company call at a time vs one
+insert_companies batch. Runs against a throwaway database file, never db/indigonode.db.
+
+    python benchmarks/bench_db_insert.py [--rows 150 1000]
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from db import database
+
+
+def make_records(n: int, start: int = 0) -> list[dict]:
+    """n distinct synthetic records, numbered from start."""
+    return [
+        {
+            "company_name": f"company{i}",
+            "description": f"Company {i} - Contact us",
+            "contact_email": f"info@company{i}.com",
+            "contact_phone": f"+1 555 {i:07d}",
+            "contact_address": f"{i} Main Street, Springfield",
+            "has_contact_form": "Yes" if i % 2 else "No",
+            "source_url": f"https://company{i}.com/contact",
+        }
+        for i in range(start, start + n)
+    ]
+
+
+def time_per_row(records: list[dict]) -> float:
+    start = time.perf_counter()
+    for r in records:
+        database.insert_company(**r)
+    return time.perf_counter() - start
+
+
+def time_bulk(records: list[dict]) -> float:
+    start = time.perf_counter()
+    database.insert_companies(records)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--rows", type=int, nargs="+", default=[150, 1000])
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in args.rows:
+            records = make_records(n)
+            results = {}
+            for label, fn in (("per-row insert_company", time_per_row), ("bulk insert_companies", time_bulk)):
+                database.DB_PATH = Path(tmp) / f"{label.split()[0]}-{n}.db"
+                database.init_db()
+                results[label] = n / fn(records)
+            for label, rate in results.items():
+                print(f"{n:>7} rows  {label:<24} {rate:>12,.0f} rows/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""
+Benchmark: per-page CPU time of contact extraction, single-pass engine vs the previous
+find_all/get_text implementation (kept below as the reference). Also checks that both
+produce identical scrape results on every generated page.
+
+    python benchmarks/bench_extract.py [--pages 200] [--repeat 3] [--parser html.parser]
+"""
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from functions.extractor import PageSignals, collect_signals, parse_html
+from functions.scraper import _extract_contact, _has_contact_form
+
+
+# --- Reference: extraction as it was before the single-pass engine ---------------------------
+
+def legacy_contact_signals(soup, text):
+    """The contact inputs as the find_all/get_text code gathered them; the picking is shared."""
+    address_tag = soup.find("address")
+    return PageSignals(
+        text=text,
+        mailto_hrefs=[a.get("href", "") for a in soup.find_all("a", href=re.compile(r"^mailto:", re.I))],
+        tel_hrefs=[a.get("href", "") for a in soup.find_all("a", href=re.compile(r"^tel:", re.I))],
+        address_text=address_tag.get_text(separator=" ", strip=True) if address_tag else None,
+        address_class_texts=[el.get_text(separator=" ", strip=True)
+                             for el in soup.find_all(class_=re.compile(r"address|location|office", re.I))],
+    )
+
+
+def legacy_has_contact_form(soup, url):
+    path_has_contact = "contact" in url.lower()
+    forms = soup.find_all("form")
+    if forms:
+        for form in forms:
+            action = (form.get("action") or "").lower()
+            form_id = (form.get("id") or "").lower()
+            form_class = " ".join(form.get("class", [])).lower() if form.get("class") else ""
+            parent_text = ""
+            for parent in form.parents:
+                if parent.name and parent.get_text(strip=True):
+                    parent_text = parent.get_text(separator=" ", strip=True)[:500].lower()
+                    break
+            if path_has_contact or "contact" in action or "contact" in form_id or "contact" in form_class or "contact" in parent_text:
+                return "Yes"
+            inputs = form.find_all(["input", "textarea"], type=re.compile(r"text|email|tel", re.I))
+            inputs += form.find_all("textarea")
+            names = " ".join((inp.get("name") or inp.get("id") or "").lower() for inp in inputs)
+            if "email" in names or "message" in names or "name" in names:
+                return "Yes"
+        return "Yes" if path_has_contact else "No"
+    form_embed_pattern = re.compile(
+        r"wufoo|typeform|jotform|google\.com/forms|forms\.office\.com|formstack|hubspot.*form|form", re.I,
+    )
+    for iframe in soup.find_all("iframe"):
+        src = (iframe.get("src") or "").lower()
+        iframe_id = (iframe.get("id") or "").lower()
+        iframe_class = " ".join(iframe.get("class", [])).lower() if iframe.get("class") else ""
+        if form_embed_pattern.search(src) or form_embed_pattern.search(iframe_id) or form_embed_pattern.search(iframe_class):
+            return "Yes"
+        if path_has_contact and ("form" in iframe_id or "form" in iframe_class or "form" in src):
+            return "Yes"
+    return "No"
+
+
+def legacy_extract(soup, url):
+    text = soup.get_text(separator=" ", strip=True)
+    description = soup.title.string.strip()[:500] if soup.title and soup.title.string else ""
+    return (description, *_extract_contact(legacy_contact_signals(soup, text)), legacy_has_contact_form(soup, url))
+
+
+def engine_extract(soup, url):
+    signals = collect_signals(soup)
+    return (signals.title.strip()[:500], *_extract_contact(signals), _has_contact_form(signals, url))
+
+
+# --- Synthetic pages -----------------------------------------------------------------------
+
+WORDS = "lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor incididunt".split()
+
+
+def _para(rng, n):
+    return " ".join(rng.choice(WORDS) for _ in range(n))
+
+
+def make_page(rng: random.Random, depth: int, sections: int) -> str:
+    """A page with nested wrappers, boilerplate text, and a random mix of contact signals."""
+    parts = [f"<html><head><title>{_para(rng, 4)}</title><style>.x{{color:red}}</style>"
+             f"<script>var office = 'not text';</script></head><body>"]
+    for s in range(sections):
+        wrap_open = "".join(f'<div class="w{d}">' for d in range(depth))
+        wrap_close = "</div>" * depth
+        body = [f"<p>{_para(rng, 40)}</p>", f"<!-- comment {s} -->"]
+        pick = rng.random()
+        if pick < 0.15:
+            body.append(f'<a href="mailto:info{s}@example.com?subject=hi">mail</a>')
+        elif pick < 0.3:
+            body.append(f'<a href="tel:+1555{rng.randint(1000000, 9999999)}">call</a>')
+        elif pick < 0.4:
+            body.append(f"<address>{rng.randint(1, 999)} Main Street, Springfield</address>")
+        elif pick < 0.5:
+            body.append(f'<span class="Office-location">{rng.randint(1, 999)} Oak Avenue, Suite 4</span>')
+        elif pick < 0.65:
+            ctx = rng.choice(["Contact us", "Newsletter", ""])
+            body.append(f'<section><h3>{ctx}</h3><div><div><form action="/{rng.choice(["send", "search"])}">'
+                        f'<input type="{rng.choice(["text", "hidden", "email"])}" name="{rng.choice(["q", "email", "name"])}">'
+                        f"<textarea id=\"msg\"></textarea></form></div></div></section>")
+        elif pick < 0.7:
+            body.append('<div><div><form><input type="hidden" name="csrf"></form></div></div>')
+        elif pick < 0.8:
+            body.append(f'<iframe src="https://{rng.choice(["forms.example", "typeform.com/to/x", "maps.example"])}"></iframe>')
+        elif pick < 0.9:
+            body.append(f"<p>Call us on +1 ({rng.randint(200, 999)}) 555-{rng.randint(1000, 9999)} today. "
+                        f"Write to sales{s}@example.org. Visit {rng.randint(1, 99)} Elm Road, Dayton OH</p>")
+        else:
+            body.append("<template><p>hidden office text</p></template><p><![CDATA[ raw ]]></p>")
+        parts.append(wrap_open + "".join(body) + wrap_close)
+    parts.append("</body></html>")
+    return "".join(parts)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--pages", type=int, default=200)
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--depth", type=int, default=12, help="Wrapper <div> nesting per section")
+    ap.add_argument("--sections", type=int, default=20)
+    ap.add_argument("--parser", default="html.parser")
+    ap.add_argument("--seed", type=int, default=1)
+    args = ap.parse_args()
+
+    rng = random.Random(args.seed)
+    pages = [(f"https://example.com/{'contact' if i % 7 == 0 else 'page'}/{i}", make_page(rng, args.depth, args.sections))
+             for i in range(args.pages)]
+    soups = [(url, parse_html(html, args.parser)) for url, html in pages]
+
+    mismatches = sum(1 for url, soup in soups if legacy_extract(soup, url) != engine_extract(soup, url))
+
+    def bench(fn):
+        best = float("inf")
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            for url, soup in soups:
+                fn(soup, url)
+            best = min(best, time.perf_counter() - start)
+        return best / len(soups) * 1000
+
+    legacy_ms = bench(legacy_extract)
+    engine_ms = bench(engine_extract)
+    parse_start = time.perf_counter()
+    for _, html in pages:
+        BeautifulSoup(html, args.parser)
+    parse_ms = (time.perf_counter() - parse_start) / len(pages) * 1000
+
+    print(f"pages: {len(pages)}  parser: {args.parser}  mismatches: {mismatches}")
+    print(f"parse (both):      {parse_ms:8.3f} ms/page")
+    print(f"legacy extraction: {legacy_ms:8.3f} ms/page")
+    print(f"single-pass:       {engine_ms:8.3f} ms/page  ({legacy_ms / engine_ms:.1f}x faster)")
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Local HTTP server serving a generated synthetic site, for benchmarks that must not touch the network.
+
+    python benchmarks/fixture_server.py [--pages 500] [--depth 4] [--page-kb 30] [--latency-ms 20] [--port 8800]
+
+Page 0 is the home page; pages link to their children in a tree with `depth` levels below the
+home page, so every page is reachable by link-following. Each page carries filler text up to
+roughly `page_kb` KB, and every seventh page is a contact page with an email, phone, address and
+form. /sitemap.xml lists every page when sitemap=True; /robots.txt is always 404.
+Responses carry no ETag/Last-Modified, so the scraper's HTTP cache never short-circuits a fetch.
+"""
+import argparse
+import math
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+WORDS = "lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor incididunt".split()
+
+
+class SyntheticSite:
+    """The pages of one generated site, built once so serving a page is only a dict lookup."""
+
+    def __init__(self, pages: int = 500, depth: int = 4, page_kb: float = 30, seed: int = 1):
+        self.pages = max(1, pages)
+        self.depth = max(1, depth)
+        # Children per page so that `depth` levels below the home page hold all pages.
+        self.fanout = max(1, math.ceil(self.pages ** (1 / self.depth)))
+        rng = random.Random(seed)
+        self._bodies = [self._render(i, rng, int(page_kb * 1024)) for i in range(self.pages)]
+
+    def children(self, i: int) -> range:
+        first = i * self.fanout + 1
+        return range(first, min(first + self.fanout, self.pages))
+
+    def path(self, i: int) -> str:
+        if i == 0:
+            return "/"
+        return f"/contact/{i}" if i % 7 == 0 else f"/page/{i}"
+
+    def _render(self, i: int, rng: random.Random, weight: int) -> bytes:
+        links = "".join(f'<li><a href="{self.path(c)}">Page {c}</a></li>' for c in self.children(i))
+        contact = ""
+        if i % 7 == 0:
+            contact = (f'<address>{i} Main Street, Springfield IL 62704</address>'
+                       f'<p>Call +1 (555) {100 + i % 900:03d}-{i % 10000:04d} or mail info{i}@example.com</p>'
+                       '<form action="/send"><input type="email" name="email"><textarea name="message"></textarea></form>')
+        head = (f"<html><head><title>Synthetic page {i}</title></head><body><nav><ul>{links}</ul></nav>"
+                f"<main><h1>Page {i}</h1>{contact}")
+        parts, size = [head], len(head)
+        while size < weight:
+            para = "<p>" + " ".join(rng.choice(WORDS) for _ in range(60)) + "</p>"
+            parts.append(para)
+            size += len(para)
+        parts.append("</main></body></html>")
+        return "".join(parts).encode()
+
+    def page_for_path(self, path: str) -> bytes | None:
+        if path in ("", "/"):
+            return self._bodies[0]
+        prefix, _, number = path.strip("/").partition("/")
+        if prefix in ("page", "contact") and number.isdigit() and int(number) < self.pages:
+            i = int(number)
+            return self._bodies[i] if self.path(i) == path.rstrip("/") else None
+        return None
+
+    def sitemap(self, base_url: str) -> bytes:
+        locs = "".join(f"<url><loc>{base_url}{self.path(i)}</loc></url>" for i in range(self.pages))
+        return ('<?xml version="1.0" encoding="UTF-8"?>'
+                f'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{locs}</urlset>').encode()
+
+
+def _make_handler(site: SyntheticSite, latency: float, sitemap: bool, counter: "FixtureServer"):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Headers and body go out in separate writes; without this, Nagle + delayed ACK adds ~40 ms per response.
+        disable_nagle_algorithm = True
+
+        def log_message(self, *args):
+            pass
+
+        def _send(self, status: int, body: bytes, content_type: str) -> None:
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            counter.count_request()
+            if latency:
+                time.sleep(latency)
+            path = self.path.split("?")[0]
+            if path == "/sitemap.xml" and sitemap:
+                host, port = self.server.server_address[:2]
+                return self._send(200, site.sitemap(f"http://{host}:{port}"), "application/xml")
+            body = site.page_for_path(path)
+            if body is None:
+                return self._send(404, b"not found", "text/plain")
+            self._send(200, body, "text/html; charset=utf-8")
+
+    return Handler
+
+
+class FixtureServer:
+    """A SyntheticSite served on 127.0.0.1 from a background thread. Use as a context manager."""
+
+    def __init__(self, site: SyntheticSite, latency_ms: float = 0, sitemap: bool = False, port: int = 0):
+        self.site = site
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), _make_handler(site, latency_ms / 1000, sitemap, self))
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    def count_request(self) -> None:
+        with self._lock:
+            self.requests += 1
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> "FixtureServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--pages", type=int, default=500)
+    ap.add_argument("--depth", type=int, default=4)
+    ap.add_argument("--page-kb", type=float, default=30)
+    ap.add_argument("--latency-ms", type=float, default=20)
+    ap.add_argument("--sitemap", action="store_true", help="Serve /sitemap.xml listing every page")
+    ap.add_argument("--port", type=int, default=8800)
+    args = ap.parse_args()
+
+    site = SyntheticSite(args.pages, args.depth, args.page_kb)
+    with FixtureServer(site, args.latency_ms, args.sitemap, args.port) as server:
+        print(f"serving {site.pages} pages (fanout {site.fanout}) at {server.base_url}/  (Ctrl-C to stop)")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
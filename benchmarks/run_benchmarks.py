@@ -0,0 +1,223 @@
+"""
+Offline benchmark suite for the scraper and database hot paths, printed as JSON.
+
+    python benchmarks/run_benchmarks.py [--suite discover scrape db] [--output results.json]
+        [--pages 300] [--depth 3] [--page-kb 30] [--latency-ms 20] [--concurrency 8]
+        [--scrape-pages 100] [--rows 1000 100000 1000000] [--per-row-sample 2000] [--parse-workers N]
+
+Everything runs against a local fixture server (benchmarks/fixture_server.py) and throwaway
+database and HTTP cache files, never db/indigonode.db or the network.
+
+- discover: discover_site_urls pages/sec and requests made, by following links and from sitemap.xml
+- scrape:   scrape_url time per page, split into fetch, parse and extract
+- db:       insert_companies rows/sec to fill tables of each size, then get_all_companies and
+            load_companies_snapshot (the app's cached, compact-dtype table) rows/sec and frame MB,
+            export_companies rows/sec (CSV, and Parquet when pyarrow is installed), import_companies
+            rows/sec of that CSV into an empty table, and insert_company rows/sec at that size
+
+The JSON holds run metadata (time, git commit, Python, platform, arguments) and one entry per
+measurement, so files from different runs can be diffed or loaded side by side.
+"""
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+from db import database
+from functions import fetcher, http_cache, parse_pool
+from functions.extractor import collect_signals, parse_html
+from functions.scraper import _extract_contact, _has_contact_form, discover_site_urls, scrape_url
+
+from bench_db_insert import make_records
+from fixture_server import FixtureServer, SyntheticSite
+
+# insert_companies is fed this many generated records at a time, so 1M rows never sit in memory at once.
+DB_CHUNK_ROWS = 10_000
+
+
+def _percentiles(samples: list[float]) -> dict:
+    """Mean / p50 / p95 / max of samples given in seconds, reported in milliseconds."""
+    ordered = sorted(samples)
+    return {
+        "mean_ms": statistics.fmean(ordered) * 1000,
+        "p50_ms": ordered[len(ordered) // 2] * 1000,
+        "p95_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000,
+        "max_ms": ordered[-1] * 1000,
+    }
+
+
+def bench_discover(args) -> list[dict]:
+    results = []
+    site = SyntheticSite(args.pages, args.depth, args.page_kb)
+    for mode, sitemap in (("links", False), ("sitemap", True)):
+        with FixtureServer(site, args.latency_ms, sitemap=sitemap) as server:
+            start = time.perf_counter()
+            urls = discover_site_urls(f"{server.base_url}/", max_pages=site.pages, concurrency=args.concurrency,
+                                      use_sitemaps=sitemap)
+            elapsed = time.perf_counter() - start
+            results.append({
+                "name": f"discover_site_urls[{mode}]",
+                "params": {"pages": site.pages, "fanout": site.fanout, "page_kb": args.page_kb,
+                           "latency_ms": args.latency_ms, "concurrency": args.concurrency},
+                "metrics": {"urls_found": len(urls), "requests": server.requests, "seconds": elapsed,
+                            "pages_per_sec": len(urls) / elapsed},
+            })
+    return results
+
+
+def bench_scrape(args) -> list[dict]:
+    site = SyntheticSite(max(args.scrape_pages, 1), args.depth, args.page_kb)
+    with FixtureServer(site, args.latency_ms) as server:
+        urls = [f"{server.base_url}{site.path(i)}" for i in range(site.pages)]
+        totals, fetches, parses, extracts = [], [], [], []
+        for url in urls:
+            start = time.perf_counter()
+            scrape_url(url)
+            totals.append(time.perf_counter() - start)
+        for url in urls:
+            t0 = time.perf_counter()
+            html = fetcher.fetch(url).text
+            t1 = time.perf_counter()
+            soup = parse_html(html)
+            t2 = time.perf_counter()
+            signals = collect_signals(soup)
+            _extract_contact(signals)
+            _has_contact_form(signals, url)
+            t3 = time.perf_counter()
+            fetches.append(t1 - t0)
+            parses.append(t2 - t1)
+            extracts.append(t3 - t2)
+    params = {"pages": site.pages, "page_kb": args.page_kb, "latency_ms": args.latency_ms}
+    return [
+        {"name": "scrape_url", "params": params, "metrics": _percentiles(totals)},
+        {"name": "scrape_url.fetch", "params": params, "metrics": _percentiles(fetches)},
+        {"name": "scrape_url.parse", "params": params, "metrics": _percentiles(parses)},
+        {"name": "scrape_url.extract", "params": params, "metrics": _percentiles(extracts)},
+    ]
+
+
+def bench_db(args, tmp: Path) -> list[dict]:
+    results = []
+    for rows in args.rows:
+        database.DB_PATH = tmp / f"bulk-{rows}.db"
+        database.init_db()
+        start = time.perf_counter()
+        for offset in range(0, rows, DB_CHUNK_ROWS):
+            database.insert_companies(make_records(min(DB_CHUNK_ROWS, rows - offset), offset))
+        bulk = time.perf_counter() - start
+
+        start = time.perf_counter()
+        df = database.get_all_companies()
+        read = time.perf_counter() - start
+        assert df is not None and len(df) == rows
+
+        start = time.perf_counter()
+        _, compact = database.load_companies_snapshot()
+        snapshot = time.perf_counter() - start
+
+        exports = {}
+        for fmt in database.TRANSFER_FORMATS:
+            path = tmp / f"export-{rows}.{fmt}"
+            start = time.perf_counter()
+            database.export_companies(path, fmt)
+            exports[fmt] = (time.perf_counter() - start, path.stat().st_size)
+
+        # Per-row inserts go into the same, already filled table, numbered after the bulk rows.
+        sample = args.per_row_sample
+        start = time.perf_counter()
+        for r in make_records(sample, rows):
+            database.insert_company(**r)
+        per_row = time.perf_counter() - start
+        database.close_connection()
+
+        database.DB_PATH = tmp / f"import-{rows}.db"
+        database.init_db()
+        start = time.perf_counter()
+        database.import_companies(tmp / f"export-{rows}.csv", "csv")
+        imported = time.perf_counter() - start
+        database.close_connection()
+
+        results += [
+            {"name": "insert_companies", "params": {"rows": rows, "chunk_rows": DB_CHUNK_ROWS},
+             "metrics": {"seconds": bulk, "rows_per_sec": rows / bulk}},
+            {"name": "insert_company", "params": {"rows": sample, "table_rows": rows},
+             "metrics": {"seconds": per_row, "rows_per_sec": sample / per_row}},
+            {"name": "get_all_companies", "params": {"rows": rows},
+             "metrics": {"seconds": read, "rows_per_sec": rows / read,
+                         "frame_mb": df.memory_usage(deep=True).sum() / 1_000_000}},
+            {"name": "load_companies_snapshot", "params": {"rows": rows},
+             "metrics": {"seconds": snapshot, "rows_per_sec": rows / snapshot,
+                         "frame_mb": compact.memory_usage(deep=True).sum() / 1_000_000}},
+            *({"name": f"export_companies[{fmt}]", "params": {"rows": rows},
+               "metrics": {"seconds": secs, "rows_per_sec": rows / secs, "file_mb": size / 1_000_000}}
+              for fmt, (secs, size) in exports.items()),
+            {"name": "import_companies[csv]", "params": {"rows": rows, "chunk_rows": database.TRANSFER_CHUNK_ROWS},
+             "metrics": {"seconds": imported, "rows_per_sec": rows / imported}},
+        ]
+    return results
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--suite", nargs="+", choices=("discover", "scrape", "db"), default=["discover", "scrape", "db"])
+    ap.add_argument("--output", type=Path, help="Write the JSON here instead of stdout")
+    ap.add_argument("--pages", type=int, default=300, help="Pages in the discovery fixture site")
+    ap.add_argument("--depth", type=int, default=3, help="Link levels below the home page")
+    ap.add_argument("--page-kb", type=float, default=30, help="Approximate size of each page")
+    ap.add_argument("--latency-ms", type=float, default=20, help="Delay the server adds to every response")
+    ap.add_argument("--concurrency", type=int, default=8)
+    ap.add_argument("--scrape-pages", type=int, default=100)
+    ap.add_argument("--rows", type=int, nargs="+", default=[1_000, 100_000, 1_000_000])
+    ap.add_argument("--per-row-sample", type=int, default=2000,
+                    help="Rows then added one insert_company call at a time (per-row inserts are slow)")
+    ap.add_argument("--parse-workers", type=int, default=parse_pool.DEFAULT_WORKERS,
+                    help="Processes parsing pages during discovery (1 parses in-thread)")
+    args = ap.parse_args()
+    parse_pool.configure(args.parse_workers)
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        http_cache.CACHE_PATH = Path(tmp) / "http_cache.db"
+        if "discover" in args.suite:
+            results += bench_discover(args)
+        if "scrape" in args.suite:
+            results += bench_scrape(args)
+        if "db" in args.suite:
+            results += bench_db(args, Path(tmp))
+        database.close_connection()
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "args": {k: str(v) if isinstance(v, Path) else v for k, v in vars(args).items()},
+        },
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
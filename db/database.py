@@ -1,25 +1,96 @@
 """
 SQLite connection and helpers for the companies table (contact information only).
+Each thread keeps one tuned connection (WAL, relaxed sync, larger cache, mmap); the schema is
+versioned with PRAGMA user_version and migrated once by init_db().
 """
+import csv
+import hashlib
+import io
+import json
+import logging
+import re
 import sqlite3
+import threading
+import uuid
+from contextlib import ExitStack
 from pathlib import Path
 from datetime import datetime
+from typing import BinaryIO, Callable, Iterator
+from urllib.parse import parse_qsl, urlencode, urlsplit
 import pandas as pd
 
+from functions import metrics
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet export/import needs pyarrow; CSV works without it
+    pa = pq = None
+
+logger = logging.getLogger(__name__)
+
 DB_DIR = Path(__file__).resolve().parent
 DB_PATH = DB_DIR / "indigonode.db"
 
+# Columns query_companies accepts for filtering and sorting (values are never interpolated).
+COMPANY_COLUMNS = ("id", "company_name", "description", "contact_email", "contact_phone",
+                   "contact_address", "has_contact_form", "source_url", "scraped_at")
+# Columns returned to callers; source_url_key and content_hash are internal bookkeeping.
+_SELECT_COLUMNS = ", ".join(COMPANY_COLUMNS)
+# Rows per fetchmany() call when exporting, and per transaction when importing.
+TRANSFER_CHUNK_ROWS = 10_000
+TRANSFER_FORMATS = ("csv", "parquet") if pq is not None else ("csv",)
+# What import_companies raises for a file it cannot read or store: bad format or columns, broken
+# CSV, corrupt or truncated Parquet, or a database error (rows imported before it stay saved).
+IMPORT_ERRORS = (ValueError, ImportError, OSError, csv.Error, sqlite3.Error) + ((pa.ArrowException,) if pa is not None else ())
+# More changes than this since a reader's version and get_changes_since asks it to reload instead.
+CHANGES_RELOAD_LIMIT = 20_000
+# Dtypes of the long-lived cached table (see _compact_companies); object strings without pyarrow.
+_TEXT_DTYPE = pd.StringDtype("pyarrow") if pa is not None else object
+_CONTACT_FORM_DTYPE = pd.CategoricalDtype(["No", "Yes"])
+
+
+# Applied to every new connection. WAL lets page reads run while the scraper writes;
+# synchronous=NORMAL is safe under WAL and avoids an fsync per commit.
+_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-32000",  # 32 MB page cache
+    "PRAGMA mmap_size=268435456",  # 256 MB
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA busy_timeout=30000",
+)
+
+_local = threading.local()
+
 
 def get_connection():
-    """Return a connection to the SQLite database."""
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
+    """
+    Return this thread's connection to the SQLite database, opened and tuned on first use.
+    Connections are reused for the life of the thread; do not close them.
+    """
+    conn = getattr(_local, "conn", None)
+    if conn is None or _local.path != DB_PATH:
+        if conn is not None:
+            conn.close()
+        conn = sqlite3.connect(DB_PATH, timeout=30)
+        conn.row_factory = sqlite3.Row
+        for pragma in _PRAGMAS:
+            conn.execute(pragma)
+        _local.conn, _local.path = conn, DB_PATH
     return conn
 
 
-def init_db():
-    """Create the companies table if it does not exist. Schema: contact info only."""
-    conn = get_connection()
+def close_connection() -> None:
+    """Close this thread's connection (a new one is opened on next use)."""
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
+        conn.close()
+        _local.conn = None
+
+
+def _migrate_create_companies(conn: sqlite3.Connection) -> None:
+    """Create the companies table; databases created before has_contact_form existed get the column."""
     conn.execute("""
         CREATE TABLE IF NOT EXISTS companies (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -33,58 +104,891 @@ def init_db():
             scraped_at TIMESTAMP
         )
     """)
-    try:
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(companies)")}
+    if "has_contact_form" not in columns:
         conn.execute("ALTER TABLE companies ADD COLUMN has_contact_form TEXT")
+
+
+def _migrate_add_query_indexes(conn: sqlite3.Connection) -> None:
+    """Indexes behind query_companies: filter columns (case-insensitive) and the default sort."""
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_companies_company_name ON companies(company_name COLLATE NOCASE)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_companies_contact_email ON companies(contact_email COLLATE NOCASE)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_companies_scraped_at ON companies(scraped_at)")
+
+
+def _migrate_add_search_index(conn: sqlite3.Connection) -> None:
+    """FTS5 index over the searchable text columns, kept in sync with companies by triggers."""
+    columns = "company_name, description, contact_email, contact_phone, contact_address"
+    new_values = "new.id, new.company_name, new.description, new.contact_email, new.contact_phone, new.contact_address"
+    old_values = "old.id, old.company_name, old.description, old.contact_email, old.contact_phone, old.contact_address"
+    conn.execute(f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS companies_fts USING fts5(
+            {columns}, content='companies', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+        )
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS companies_fts_ai AFTER INSERT ON companies BEGIN
+            INSERT INTO companies_fts(rowid, {columns}) VALUES ({new_values});
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS companies_fts_ad AFTER DELETE ON companies BEGIN
+            INSERT INTO companies_fts(companies_fts, rowid, {columns}) VALUES ('delete', {old_values});
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS companies_fts_au AFTER UPDATE ON companies BEGIN
+            INSERT INTO companies_fts(companies_fts, rowid, {columns}) VALUES ('delete', {old_values});
+            INSERT INTO companies_fts(rowid, {columns}) VALUES ({new_values});
+        END
+    """)
+    conn.execute("INSERT INTO companies_fts(companies_fts) VALUES ('rebuild')")
+
+
+def _domain_sql(url: str) -> str:
+    """SQL expression for the host of a URL column/value, lowercased and without "www." (e.g. new.source_url)."""
+    rest = f"(CASE WHEN instr(coalesce({url}, ''), '://') > 0 THEN substr({url}, instr({url}, '://') + 3) ELSE coalesce({url}, '') END)"
+    host = f"lower(CASE WHEN instr({rest}, '/') > 0 THEN substr({rest}, 1, instr({rest}, '/') - 1) ELSE {rest} END)"
+    return f"(CASE WHEN {host} LIKE 'www.%' THEN substr({host}, 5) ELSE {host} END)"
+
+
+def _filled_sql(column: str) -> str:
+    """SQL expression: 1 if the text column is non-blank, else 0."""
+    return f"(trim(coalesce({column}, ''), char(9, 10, 13, 32)) != '')"
+
+
+def _summary_delta_sql(row: str, sign: str) -> list[str]:
+    """Statements that add (sign "+") or remove (sign "-") one row's contribution to the summary tables."""
+    domain, day = _domain_sql(f"{row}.source_url"), f"substr(coalesce({row}.scraped_at, ''), 1, 10)"
+    statements = [
+        f"""UPDATE companies_summary SET total = total {sign} 1,
+               with_email = with_email {sign} {_filled_sql(row + ".contact_email")},
+               with_phone = with_phone {sign} {_filled_sql(row + ".contact_phone")},
+               with_address = with_address {sign} {_filled_sql(row + ".contact_address")}
+           WHERE id = 1;""",
+    ]
+    for table, key, value in (("companies_by_domain", "domain", domain), ("companies_by_day", "day", day)):
+        if sign == "+":
+            statements.append(f"INSERT INTO {table}({key}, total) VALUES ({value}, 1) "
+                              f"ON CONFLICT({key}) DO UPDATE SET total = total + 1;")
+        else:
+            statements.append(f"UPDATE {table} SET total = total - 1 WHERE {key} = {value};")
+            statements.append(f"DELETE FROM {table} WHERE {key} = {value} AND total <= 0;")
+    return statements
+
+
+def _migrate_add_dashboard_summary(conn: sqlite3.Connection) -> None:
+    """Summary tables for the Dashboard (totals, per domain, per day), maintained by triggers."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS companies_summary (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            total INTEGER NOT NULL DEFAULT 0,
+            with_email INTEGER NOT NULL DEFAULT 0,
+            with_phone INTEGER NOT NULL DEFAULT 0,
+            with_address INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    conn.execute("CREATE TABLE IF NOT EXISTS companies_by_domain (domain TEXT PRIMARY KEY, total INTEGER NOT NULL)")
+    conn.execute("CREATE TABLE IF NOT EXISTS companies_by_day (day TEXT PRIMARY KEY, total INTEGER NOT NULL)")
+
+    conn.execute("DELETE FROM companies_summary")
+    conn.execute(f"""
+        INSERT INTO companies_summary (id, total, with_email, with_phone, with_address)
+        SELECT 1, COUNT(*), COALESCE(SUM({_filled_sql("contact_email")}), 0),
+               COALESCE(SUM({_filled_sql("contact_phone")}), 0), COALESCE(SUM({_filled_sql("contact_address")}), 0)
+        FROM companies
+    """)
+    conn.execute("DELETE FROM companies_by_domain")
+    conn.execute(f"INSERT INTO companies_by_domain SELECT {_domain_sql('source_url')} AS d, COUNT(*) FROM companies GROUP BY d")
+    conn.execute("DELETE FROM companies_by_day")
+    conn.execute("INSERT INTO companies_by_day SELECT substr(coalesce(scraped_at, ''), 1, 10) AS d, COUNT(*) FROM companies GROUP BY d")
+
+    add, remove = _summary_delta_sql("new", "+"), _summary_delta_sql("old", "-")
+    conn.execute(f"CREATE TRIGGER IF NOT EXISTS companies_summary_ai AFTER INSERT ON companies BEGIN {' '.join(add)} END")
+    conn.execute(f"CREATE TRIGGER IF NOT EXISTS companies_summary_ad AFTER DELETE ON companies BEGIN {' '.join(remove)} END")
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS companies_summary_au
+        AFTER UPDATE OF contact_email, contact_phone, contact_address, source_url, scraped_at ON companies
+        BEGIN {' '.join(remove + add)} END
+    """)
+
+
+def _migrate_add_change_log(conn: sqlite3.Connection) -> None:
+    """Change log: every insert/update/delete on companies appends the row id under an increasing seq."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS companies_changes (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            company_id INTEGER NOT NULL
+        )
+    """)
+    for name, event, row in (("ai", "INSERT", "new"), ("au", "UPDATE", "new"), ("ad", "DELETE", "old")):
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS companies_changes_{name} AFTER {event} ON companies BEGIN
+                INSERT INTO companies_changes (company_id) VALUES ({row}.id);
+            END
+        """)
+
+
+def normalize_source_url(url: str) -> str:
+    """
+    Key used to recognise the same page across scrapes: lowercase host without "www." or a
+    default port, path without trailing slash, sorted query; scheme and fragment are ignored
+    ("https://www.Acme.com/contact/#form" -> "acme.com/contact"). "" for blank input.
+    """
+    url = (url or "").strip()
+    if not url:
+        return ""
+    parsed = urlsplit(url if "://" in url else f"http://{url}")
+    host = (parsed.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    try:
+        port = parsed.port
+    except ValueError:
+        port = None
+    if port and port not in (80, 443):
+        host = f"{host}:{port}"
+    path = parsed.path.rstrip("/") or "/"
+    query = urlencode(sorted(parse_qsl(parsed.query, keep_blank_values=True)))
+    return f"{host}{path}?{query}" if query else f"{host}{path}"
+
+
+# Fields covered by content_hash, i.e. what the scraper extracts from a page.
+_HASHED_FIELDS = ("company_name", "description", "contact_email", "contact_phone",
+                  "contact_address", "has_contact_form")
+
+
+def content_hash(record: dict) -> str:
+    """Stable hash of a record's extracted fields."""
+    joined = "\x1f".join(str(record.get(f) or "").strip() for f in _HASHED_FIELDS)
+    return hashlib.sha1(joined.encode("utf-8")).hexdigest()
+
+
+def _migrate_add_source_url_key(conn: sqlite3.Connection) -> None:
+    """
+    Normalized source URL (unique when non-blank) and content hash for upserts. Existing rows are
+    backfilled and duplicate URLs collapsed to their newest row; the older rows are copied to
+    companies_duplicates_backup before they are deleted, and a warning is logged. The FTS update
+    trigger is narrowed to the indexed columns so refreshing scraped_at does not re-index a row.
+    """
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(companies)")}
+    if "source_url_key" not in columns:
+        conn.execute("ALTER TABLE companies ADD COLUMN source_url_key TEXT NOT NULL DEFAULT ''")
+    if "content_hash" not in columns:
+        conn.execute("ALTER TABLE companies ADD COLUMN content_hash TEXT NOT NULL DEFAULT ''")
+    rows = conn.execute(f"SELECT {', '.join(COMPANY_COLUMNS)} FROM companies").fetchall()
+    conn.executemany(
+        "UPDATE companies SET source_url_key = ?, content_hash = ? WHERE id = ?",
+        [(normalize_source_url(r["source_url"]), content_hash(dict(r)), r["id"]) for r in rows],
+    )
+    duplicates = """
+        FROM companies WHERE source_url_key != '' AND id NOT IN (
+            SELECT MAX(id) FROM companies WHERE source_url_key != '' GROUP BY source_url_key
+        )
+    """
+    dropped = conn.execute(f"SELECT COUNT(*) {duplicates}").fetchone()[0]
+    if dropped:
+        conn.execute(f"CREATE TABLE IF NOT EXISTS companies_duplicates_backup AS SELECT * {duplicates} LIMIT 0")
+        conn.execute(f"INSERT INTO companies_duplicates_backup SELECT * {duplicates}")
+        conn.execute(f"DELETE {duplicates}")
+        logger.warning("Merged %d company row(s) that shared a source URL with a newer row; "
+                       "the older rows were copied to companies_duplicates_backup", dropped)
+    conn.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_companies_source_url_key
+        ON companies(source_url_key) WHERE source_url_key != ''
+    """)
+    fts_columns = "company_name, description, contact_email, contact_phone, contact_address"
+    conn.execute("DROP TRIGGER IF EXISTS companies_fts_au")
+    conn.execute(f"""
+        CREATE TRIGGER companies_fts_au AFTER UPDATE OF {fts_columns} ON companies BEGIN
+            INSERT INTO companies_fts(companies_fts, rowid, {fts_columns})
+            VALUES ('delete', old.id, old.company_name, old.description, old.contact_email, old.contact_phone, old.contact_address);
+            INSERT INTO companies_fts(rowid, {fts_columns})
+            VALUES (new.id, new.company_name, new.description, new.contact_email, new.contact_phone, new.contact_address);
+        END
+    """)
+
+
+def _migrate_add_crawl_jobs(conn: sqlite3.Connection) -> None:
+    """Job table for batch crawls: one row per start URL, with status so interrupted runs can resume."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS crawl_jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            batch TEXT NOT NULL,
+            start_url TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending',
+            pages_found INTEGER NOT NULL DEFAULT 0,
+            pages_saved INTEGER NOT NULL DEFAULT 0,
+            error TEXT NOT NULL DEFAULT '',
+            updated_at TIMESTAMP,
+            UNIQUE (batch, start_url)
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_crawl_jobs_batch_status ON crawl_jobs(batch, status)")
+
+
+def _migrate_add_app_jobs(conn: sqlite3.Connection) -> None:
+    """
+    Let crawl_jobs also queue the app's discover/scrape jobs: a job kind, its parameters as JSON,
+    and a crawl_job_items table holding each job's results as they arrive.
+    """
+    conn.execute("ALTER TABLE crawl_jobs ADD COLUMN kind TEXT NOT NULL DEFAULT 'site'")
+    conn.execute("ALTER TABLE crawl_jobs ADD COLUMN params TEXT NOT NULL DEFAULT '{}'")
+    conn.execute("ALTER TABLE crawl_jobs ADD COLUMN created_at TIMESTAMP")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_crawl_jobs_kind_status ON crawl_jobs(kind, status)")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS crawl_job_items (
+            job_id INTEGER NOT NULL,
+            seq INTEGER NOT NULL,
+            data TEXT NOT NULL,
+            PRIMARY KEY (job_id, seq)
+        ) WITHOUT ROWID
+    """)
+
+
+# Schema migrations in order. PRAGMA user_version records how many have been applied;
+# append new steps, never edit or reorder existing ones.
+MIGRATIONS = [
+    _migrate_create_companies,
+    _migrate_add_query_indexes,
+    _migrate_add_search_index,
+    _migrate_add_dashboard_summary,
+    _migrate_add_change_log,
+    _migrate_add_source_url_key,
+    _migrate_add_crawl_jobs,
+    _migrate_add_app_jobs,
+]
+
+
+def init_db():
+    """Bring the schema up to date. Each pending migration runs once, in its own transaction."""
+    conn = get_connection()
+    if conn.execute("PRAGMA user_version").fetchone()[0] >= len(MIGRATIONS):
+        return
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        # Re-read under the write lock in case another process migrated first.
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        for number, migration in enumerate(MIGRATIONS[version:], start=version + 1):
+            migration(conn)
+            conn.execute(f"PRAGMA user_version = {number}")
         conn.commit()
-    except sqlite3.OperationalError:
-        pass
-    conn.commit()
-    conn.close()
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def _record_values(r: dict) -> tuple:
+    """Column values for a record dict, in the order of the INSERT statements below."""
+    return (r.get("company_name") or "", r.get("description") or "", r.get("contact_email") or "",
+            r.get("contact_phone") or "", r.get("contact_address") or "", r.get("has_contact_form") or "No",
+            r.get("source_url") or "", normalize_source_url(r.get("source_url")),
+            r.get("content_hash") or content_hash(r))
 
 
 def insert_company(company_name: str, description: str, contact_email: str, contact_phone: str,
                    contact_address: str, has_contact_form: str, source_url: str) -> None:
-    """Insert one company record (contact information)."""
+    """Insert one company record (contact information). A source URL already stored raises sqlite3.IntegrityError."""
+    insert_companies([{
+        "company_name": company_name, "description": description, "contact_email": contact_email,
+        "contact_phone": contact_phone, "contact_address": contact_address,
+        "has_contact_form": has_contact_form, "source_url": source_url,
+    }])
+
+
+@metrics.timed("db.insert_companies")
+def insert_companies(records: list[dict]) -> list[int]:
+    """
+    Insert many company records (dicts with the insert_company fields) in one transaction.
+    Returns the new ids in the same order as records. Use upsert_companies for scraped pages
+    that may already be stored; here a duplicate source URL raises sqlite3.IntegrityError.
+    """
+    if not records:
+        return []
+    now = datetime.utcnow().isoformat()
+    rows = [(*_record_values(r), now) for r in records]
     conn = get_connection()
-    conn.execute(
-        """INSERT INTO companies (company_name, description, contact_email, contact_phone, contact_address, has_contact_form, source_url, scraped_at)
-           VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
-        (company_name, description or "", contact_email or "", contact_phone or "", contact_address or "",
-         has_contact_form or "No", source_url, datetime.utcnow().isoformat()),
-    )
-    conn.commit()
-    conn.close()
+    with conn:
+        conn.executemany(
+            """INSERT INTO companies (company_name, description, contact_email, contact_phone, contact_address, has_contact_form,
+                                      source_url, source_url_key, content_hash, scraped_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            rows,
+        )
+        # The transaction holds the write lock, so the new AUTOINCREMENT ids are consecutive.
+        last_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+    return list(range(last_id - len(rows) + 1, last_id + 1))
+
+
+@metrics.timed("db.upsert_companies")
+def upsert_companies(records: list[dict], refresh_scraped_at: bool = True) -> list[int]:
+    """
+    Save scraped records keyed on their normalized source URL, in one transaction.
+    New URLs are inserted. For a URL already stored, only scraped_at is refreshed when the
+    content hash matches (so edits made in the app survive an unchanged re-scrape); otherwise
+    the row takes the new values. Records may carry "content_hash" (hash of the fields as
+    scraped, before any user edits); it is computed from the record otherwise. A record whose
+    fields no longer match its "content_hash" was edited before saving, and always replaces
+    the stored values. Records may also carry "scraped_at" (as when imported from a file); it
+    defaults to now. With refresh_scraped_at=False a stored row keeps its scraped_at; only
+    inserted rows take the record's.
+    Returns the row id for each record, in order.
+    """
+    if not records:
+        return []
+    now = datetime.utcnow().isoformat()
+    ids = []
+    conn = get_connection()
+    with conn:
+        for r in records:
+            rows = conn.execute(
+                """INSERT INTO companies (company_name, description, contact_email, contact_phone, contact_address, has_contact_form,
+                                          source_url, source_url_key, content_hash, scraped_at)
+                   VALUES (?1, ?2, ?3, ?4, ?5, ?6, ?7, ?8, ?9, ?10)
+                   ON CONFLICT(source_url_key) WHERE source_url_key != '' DO UPDATE SET
+                       scraped_at = CASE WHEN ?12 THEN excluded.scraped_at ELSE scraped_at END,
+                       company_name = CASE WHEN content_hash = excluded.content_hash AND NOT ?11 THEN company_name ELSE excluded.company_name END,
+                       description = CASE WHEN content_hash = excluded.content_hash AND NOT ?11 THEN description ELSE excluded.description END,
+                       contact_email = CASE WHEN content_hash = excluded.content_hash AND NOT ?11 THEN contact_email ELSE excluded.contact_email END,
+                       contact_phone = CASE WHEN content_hash = excluded.content_hash AND NOT ?11 THEN contact_phone ELSE excluded.contact_phone END,
+                       contact_address = CASE WHEN content_hash = excluded.content_hash AND NOT ?11 THEN contact_address ELSE excluded.contact_address END,
+                       has_contact_form = CASE WHEN content_hash = excluded.content_hash AND NOT ?11 THEN has_contact_form ELSE excluded.has_contact_form END,
+                       source_url = CASE WHEN content_hash = excluded.content_hash AND NOT ?11 THEN source_url ELSE excluded.source_url END,
+                       content_hash = excluded.content_hash
+                   RETURNING id""",
+                (*_record_values(r), r.get("scraped_at") or now,
+                 bool(r.get("content_hash")) and r["content_hash"] != content_hash(r), refresh_scraped_at),
+            ).fetchall()
+            ids.append(rows[0][0])
+    return ids
 
 
+@metrics.timed("db.delete_company")
 def delete_company(company_id: int) -> None:
     """Delete one company record by id."""
     conn = get_connection()
-    conn.execute("DELETE FROM companies WHERE id = ?", (company_id,))
-    conn.commit()
-    conn.close()
+    with conn:
+        conn.execute("DELETE FROM companies WHERE id = ?", (company_id,))
 
 
+@metrics.timed("db.update_company")
 def update_company(company_id: int, company_name: str, description: str, contact_email: str,
                   contact_phone: str, contact_address: str, has_contact_form: str, source_url: str) -> None:
-    """Update one company record by id (contact information only; scraped_at unchanged)."""
+    """
+    Update one company record by id (contact information only; scraped_at unchanged).
+    Changing source_url to one stored on another row raises sqlite3.IntegrityError.
+    """
     conn = get_connection()
-    conn.execute(
-        """UPDATE companies SET company_name=?, description=?, contact_email=?, contact_phone=?,
-           contact_address=?, has_contact_form=?, source_url=? WHERE id=?""",
-        (company_name or "", description or "", contact_email or "", contact_phone or "",
-         contact_address or "", has_contact_form or "No", source_url or "", company_id),
-    )
-    conn.commit()
-    conn.close()
+    with conn:
+        conn.execute(
+            """UPDATE companies SET company_name=?, description=?, contact_email=?, contact_phone=?,
+               contact_address=?, has_contact_form=?, source_url=?, source_url_key=? WHERE id=?""",
+            (company_name or "", description or "", contact_email or "", contact_phone or "",
+             contact_address or "", has_contact_form or "No", source_url or "", normalize_source_url(source_url),
+             company_id),
+        )
+
+
+@metrics.timed("db.update_companies")
+def update_companies(records: list[dict]) -> None:
+    """Update many company records in one transaction. Each dict needs "id" plus the update_company fields."""
+    if not records:
+        return
+    rows = [
+        (r.get("company_name") or "", r.get("description") or "", r.get("contact_email") or "",
+         r.get("contact_phone") or "", r.get("contact_address") or "", r.get("has_contact_form") or "No",
+         r.get("source_url") or "", normalize_source_url(r.get("source_url")), r["id"])
+        for r in records
+    ]
+    conn = get_connection()
+    with conn:
+        conn.executemany(
+            """UPDATE companies SET company_name=?, description=?, contact_email=?, contact_phone=?,
+               contact_address=?, has_contact_form=?, source_url=?, source_url_key=? WHERE id=?""",
+            rows,
+        )
+
 
+# Crawl job states: pending -> running -> done | failed.
+JOB_PENDING, JOB_RUNNING, JOB_DONE, JOB_FAILED = "pending", "running", "done", "failed"
+JOB_CANCELLED = "cancelled"
+# Job kinds: "site" is a batch_scrape.py start URL; "discover" and "scrape" are queued by the Home page.
+# For app jobs, pages_found is the expected number of results and pages_saved how many are stored so far.
+JOB_SITE, JOB_DISCOVER, JOB_SCRAPE = "site", "discover", "scrape"
+APP_JOB_KINDS = (JOB_DISCOVER, JOB_SCRAPE)
 
+
+def _in_clause(values) -> str:
+    return f"({','.join('?' * len(values))})"
+
+
+def enqueue_crawl_jobs(batch: str, start_urls: list[str]) -> int:
+    """Add start URLs to a batch as pending jobs; URLs already in the batch are left as they are. Returns how many were added."""
+    now = datetime.utcnow().isoformat()
+    conn = get_connection()
+    with conn:
+        before = conn.total_changes
+        conn.executemany(
+            "INSERT OR IGNORE INTO crawl_jobs (batch, start_url, status, updated_at, created_at) VALUES (?, ?, ?, ?, ?)",
+            [(batch, u, JOB_PENDING, now, now) for u in start_urls],
+        )
+        return conn.total_changes - before
+
+
+def submit_crawl_job(kind: str, start_url: str, params: dict, expected: int = 0) -> int:
+    """Queue one app job (JOB_DISCOVER or JOB_SCRAPE) with its parameters. Returns the job id."""
+    now = datetime.utcnow().isoformat()
+    conn = get_connection()
+    with conn:
+        return conn.execute(
+            """INSERT INTO crawl_jobs (batch, start_url, status, kind, params, pages_found, updated_at, created_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+            # Each app job is its own batch, so the same site can be queued more than once.
+            (f"app-{uuid.uuid4().hex}", start_url, JOB_PENDING, kind, json.dumps(params),
+             expected, now, now),
+        ).lastrowid
+
+
+def claim_crawl_job(batch: str | None = None, kinds: tuple[str, ...] | None = None) -> sqlite3.Row | None:
+    """
+    Atomically mark the oldest pending job (of a batch and/or of the given kinds) as running and
+    return it (None when none are left).
+    """
+    where, args = ["status = ?"], [JOB_PENDING]
+    if batch is not None:
+        where.append("batch = ?")
+        args.append(batch)
+    if kinds is not None:
+        where.append(f"kind IN {_in_clause(kinds)}")
+        args.extend(kinds)
+    conn = get_connection()
+    with conn:
+        rows = conn.execute(
+            f"""UPDATE crawl_jobs SET status = ?, updated_at = ?
+                WHERE id = (SELECT id FROM crawl_jobs WHERE {' AND '.join(where)} ORDER BY id LIMIT 1)
+                RETURNING id, batch, start_url, kind, params""",
+            (JOB_RUNNING, datetime.utcnow().isoformat(), *args),
+        ).fetchall()
+    return rows[0] if rows else None
+
+
+def finish_crawl_job(job_id: int, status: str, pages_found: int = 0, pages_saved: int = 0, error: str = "") -> None:
+    """Record a job's outcome (status is JOB_DONE, JOB_FAILED, or JOB_PENDING to hand it back)."""
+    conn = get_connection()
+    with conn:
+        conn.execute(
+            "UPDATE crawl_jobs SET status = ?, pages_found = ?, pages_saved = ?, error = ?, updated_at = ? WHERE id = ?",
+            (status, pages_found, pages_saved, error[:500], datetime.utcnow().isoformat(), job_id),
+        )
+
+
+@metrics.timed("db.append_crawl_job_items")
+def append_crawl_job_items(job_id: int, items: list) -> bool:
+    """
+    Store partial results of a running job (JSON-serializable items, kept in order).
+    Returns False, storing nothing, when the job is no longer running (cancelled or deleted).
+    """
+    conn = get_connection()
+    with conn:
+        bumped = conn.execute(
+            """UPDATE crawl_jobs SET pages_saved = pages_saved + ?, pages_found = MAX(pages_found, pages_saved + ?),
+                      updated_at = ?
+               WHERE id = ? AND status = ?""",
+            (len(items), len(items), datetime.utcnow().isoformat(), job_id, JOB_RUNNING),
+        ).rowcount
+        if not bumped:
+            return False
+        start = conn.execute(
+            "SELECT COALESCE(MAX(seq), 0) FROM crawl_job_items WHERE job_id = ?", (job_id,)
+        ).fetchone()[0]
+        conn.executemany(
+            "INSERT INTO crawl_job_items (job_id, seq, data) VALUES (?, ?, ?)",
+            [(job_id, start + i, json.dumps(item)) for i, item in enumerate(items, start=1)],
+        )
+    return True
+
+
+def get_crawl_job(job_id: int) -> sqlite3.Row | None:
+    """One job row, or None if it does not exist."""
+    return get_connection().execute(
+        """SELECT id, batch, start_url, kind, params, status, pages_found, pages_saved, error, created_at, updated_at
+           FROM crawl_jobs WHERE id = ?""",
+        (job_id,),
+    ).fetchone()
+
+
+def get_crawl_job_items(job_id: int) -> list:
+    """A job's stored results, in the order they were produced."""
+    rows = get_connection().execute(
+        "SELECT data FROM crawl_job_items WHERE job_id = ? ORDER BY seq", (job_id,)
+    ).fetchall()
+    return [json.loads(row[0]) for row in rows]
+
+
+def list_crawl_jobs(kinds: tuple[str, ...] = APP_JOB_KINDS, limit: int = 20) -> list[sqlite3.Row]:
+    """Most recent jobs of the given kinds, newest first."""
+    return get_connection().execute(
+        f"""SELECT id, start_url, kind, status, pages_found, pages_saved, error, created_at, updated_at
+            FROM crawl_jobs WHERE kind IN {_in_clause(kinds)} ORDER BY id DESC LIMIT ?""",
+        (*kinds, limit),
+    ).fetchall()
+
+
+def cancel_crawl_job(job_id: int) -> bool:
+    """Cancel a pending or running job; a running job stops at its next partial save. Returns False if it had already ended."""
+    conn = get_connection()
+    with conn:
+        return conn.execute(
+            "UPDATE crawl_jobs SET status = ?, updated_at = ? WHERE id = ? AND status IN (?, ?)",
+            (JOB_CANCELLED, datetime.utcnow().isoformat(), job_id, JOB_PENDING, JOB_RUNNING),
+        ).rowcount > 0
+
+
+def requeue_crawl_jobs(batch: str | None = None, include_failed: bool = False,
+                       kinds: tuple[str, ...] | None = None) -> int:
+    """
+    Put jobs left running by a crashed or interrupted run (and optionally failed ones) back to
+    pending, for one batch and/or the given kinds. Partial results of those jobs are dropped.
+    """
+    statuses = (JOB_RUNNING, JOB_FAILED) if include_failed else (JOB_RUNNING,)
+    where, args = [f"status IN {_in_clause(statuses)}"], list(statuses)
+    if batch is not None:
+        where.append("batch = ?")
+        args.append(batch)
+    if kinds is not None:
+        where.append(f"kind IN {_in_clause(kinds)}")
+        args.extend(kinds)
+    where_sql = " AND ".join(where)
+    conn = get_connection()
+    with conn:
+        conn.execute(f"DELETE FROM crawl_job_items WHERE job_id IN (SELECT id FROM crawl_jobs WHERE {where_sql})", args)
+        return conn.execute(
+            f"UPDATE crawl_jobs SET status = ?, error = '', pages_saved = 0 WHERE {where_sql}", (JOB_PENDING, *args)
+        ).rowcount
+
+
+def crawl_job_counts(batch: str) -> dict:
+    """Number of jobs per status in a batch."""
+    rows = get_connection().execute(
+        "SELECT status, COUNT(*) FROM crawl_jobs WHERE batch = ? GROUP BY status", (batch,)
+    ).fetchall()
+    return {status: count for status, count in rows}
+
+
+@metrics.timed("db.get_all_companies")
 def get_all_companies() -> pd.DataFrame | None:
     """Return all companies as a DataFrame. Caller must ensure init_db() has run (e.g. via app_cache.init_db_once())."""
-    conn = get_connection()
     try:
-        df = pd.read_sql_query("SELECT * FROM companies ORDER BY scraped_at DESC", conn)
-        return df
+        return pd.read_sql_query(f"SELECT {_SELECT_COLUMNS} FROM companies ORDER BY scraped_at DESC, id DESC", get_connection())
     except Exception:
         return None
+
+
+def _compact_companies(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Companies frame with compact dtypes, for the table the app keeps cached: text columns as
+    pyarrow-backed strings (NULL read as ""), has_contact_form as a No/Yes category (anything
+    but "yes" counts as No, as on the Company Information page) and scraped_at as a datetime.
+    """
+    text_columns = [c for c in COMPANY_COLUMNS if c not in ("id", "has_contact_form", "scraped_at")]
+    is_yes = df["has_contact_form"].fillna("").str.strip().str.lower() == "yes"
+    return df.assign(
+        **{c: df[c].fillna("").astype(_TEXT_DTYPE) for c in text_columns},
+        has_contact_form=pd.Categorical.from_codes(is_yes.astype("int8"), dtype=_CONTACT_FORM_DTYPE),
+        scraped_at=pd.to_datetime(df["scraped_at"], format="ISO8601", errors="coerce"),
+    )
+
+
+def _change_version(conn: sqlite3.Connection) -> int:
+    row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'companies_changes'").fetchone()
+    return row[0] if row else 0
+
+
+@metrics.timed("db.load_companies_snapshot")
+def load_companies_snapshot() -> tuple[int, pd.DataFrame]:
+    """All companies (as get_all_companies, in compact dtypes) together with the change version they reflect."""
+    conn = get_connection()
+    with conn:
+        conn.execute("BEGIN")  # one read snapshot for both queries
+        version = _change_version(conn)
+        df = pd.read_sql_query(f"SELECT {_SELECT_COLUMNS} FROM companies ORDER BY scraped_at DESC, id DESC", conn)
+    return version, _compact_companies(df)
+
+
+@metrics.timed("db.get_changes_since")
+def get_changes_since(version: int) -> tuple[int, pd.DataFrame, list[int]] | None:
+    """
+    Rows changed after version: (new version, current rows of inserted/updated companies in the
+    compact dtypes of load_companies_snapshot, deleted ids).
+    Returns None if the log no longer reaches back to version (pruned) or holds more than
+    CHANGES_RELOAD_LIMIT changes since it (e.g. after a bulk import); reload everything then.
+    """
+    conn = get_connection()
+    with conn:
+        conn.execute("BEGIN")  # one read snapshot for all queries
+        current = _change_version(conn)
+        if current == version:
+            return version, pd.DataFrame(), []
+        oldest = conn.execute("SELECT MIN(seq) FROM companies_changes").fetchone()[0]
+        if oldest is None or oldest > version + 1 or current - version > CHANGES_RELOAD_LIMIT:
+            return None
+        ids = [r[0] for r in conn.execute(
+            "SELECT DISTINCT company_id FROM companies_changes WHERE seq > ? AND seq <= ?", (version, current)
+        )]
+        placeholders = ",".join("?" * len(ids))
+        changed = pd.read_sql_query(f"SELECT {_SELECT_COLUMNS} FROM companies WHERE id IN ({placeholders})", conn, params=ids)
+    deleted = sorted(set(ids) - set(changed["id"]))
+    return current, _compact_companies(changed), deleted
+
+
+def prune_changes(upto_version: int) -> None:
+    """Drop change-log entries at or below upto_version (already applied by the reader)."""
+    conn = get_connection()
+    with conn:
+        conn.execute("DELETE FROM companies_changes WHERE seq <= ?", (upto_version,))
+
+
+def _like_pattern(value: str) -> str:
+    """Substring LIKE pattern with %, _ and the escape character itself escaped."""
+    escaped = value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def _filter_clause(filters: dict | None) -> tuple[str, list]:
+    """WHERE clause and parameters for column -> substring filters (case-insensitive)."""
+    clauses, params = [], []
+    for column, value in (filters or {}).items():
+        if column not in COMPANY_COLUMNS:
+            raise ValueError(f"Unknown filter column: {column}")
+        if value is None or not str(value).strip():
+            continue
+        clauses.append(f"{column} LIKE ? ESCAPE '\\'")
+        params.append(_like_pattern(str(value).strip()))
+    return (f" WHERE {' AND '.join(clauses)}" if clauses else ""), params
+
+
+@metrics.timed("db.count_companies")
+def count_companies(filters: dict | None = None) -> int:
+    """Number of companies matching filters (same rules as query_companies)."""
+    where, params = _filter_clause(filters)
+    return get_connection().execute(f"SELECT COUNT(*) FROM companies{where}", params).fetchone()[0]
+
+
+@metrics.timed("db.query_companies")
+def query_companies(filters: dict | None = None, sort: tuple[str, str] = ("scraped_at", "desc"),
+                    limit: int = 50, offset: int = 0) -> pd.DataFrame:
+    """
+    Return one page of companies as a DataFrame.
+    filters maps column name -> substring (case-insensitive); empty values are ignored.
+    sort is (column, "asc" | "desc"). Unknown columns raise ValueError.
+    """
+    where, params = _filter_clause(filters)
+    sort_column, direction = sort
+    if sort_column not in COMPANY_COLUMNS:
+        raise ValueError(f"Unknown sort column: {sort_column}")
+    direction = "ASC" if str(direction).lower() == "asc" else "DESC"
+    return pd.read_sql_query(
+        f"SELECT {_SELECT_COLUMNS} FROM companies{where} ORDER BY {sort_column} {direction}, id {direction} LIMIT ? OFFSET ?",
+        get_connection(),
+        params=[*params, int(limit), int(offset)],
+    )
+
+
+def _fts_prefix_query(text: str) -> str:
+    """FTS5 MATCH expression: every word in text must match as a prefix ("acme co" -> "acme"* "co"*)."""
+    return " ".join(f'"{token}"*' for token in re.findall(r"\w+", text))
+
+
+@metrics.timed("db.search_companies")
+def search_companies(text: str, limit: int = 50) -> pd.DataFrame:
+    """
+    Full-text search over name, description, email, phone and address.
+    Every word is prefix-matched; the best limit hits are returned, best first (bm25).
+    Text with no word characters (such as "@" or "+") cannot go through the index; it is
+    matched as a substring of name, email or phone instead, newest first.
+    """
+    match = _fts_prefix_query(text)
+    if not match:
+        if not text.strip():
+            return pd.DataFrame(columns=list(COMPANY_COLUMNS))
+        return pd.read_sql_query(
+            f"""SELECT {_SELECT_COLUMNS} FROM companies
+                WHERE company_name LIKE ?1 ESCAPE '\\' OR contact_email LIKE ?1 ESCAPE '\\'
+                   OR contact_phone LIKE ?1 ESCAPE '\\'
+                ORDER BY id DESC LIMIT ?2""",
+            get_connection(),
+            params=[_like_pattern(text.strip()), int(limit)],
+        )
+    return pd.read_sql_query(
+        f"""SELECT {", ".join("c." + col for col in COMPANY_COLUMNS)}
+            FROM companies_fts f JOIN companies c ON c.id = f.rowid
+            WHERE companies_fts MATCH ? ORDER BY f.rank LIMIT ?""",
+        get_connection(),
+        params=[match, int(limit)],
+    )
+
+
+@metrics.timed("db.get_dashboard_stats")
+def get_dashboard_stats(top_domains: int = 10, days: int = 30) -> dict:
+    """
+    Dashboard numbers from the trigger-maintained summary tables (no scan of companies).
+    Returns total, with_email, with_phone, with_address, plus DataFrames "domains"
+    (top domains by count) and "daily" (companies per scrape day, most recent days).
+    """
+    conn = get_connection()
+    row = conn.execute("SELECT total, with_email, with_phone, with_address FROM companies_summary WHERE id = 1").fetchone()
+    stats = dict(row) if row else {"total": 0, "with_email": 0, "with_phone": 0, "with_address": 0}
+    stats["domains"] = pd.read_sql_query(
+        "SELECT domain, total FROM companies_by_domain WHERE domain != '' ORDER BY total DESC, domain LIMIT ?",
+        conn, params=[int(top_domains)],
+    )
+    stats["daily"] = pd.read_sql_query(
+        "SELECT day, total FROM (SELECT day, total FROM companies_by_day WHERE day != '' ORDER BY day DESC LIMIT ?) ORDER BY day",
+        conn, params=[int(days)],
+    )
+    return stats
+
+
+# Columns a file may provide on import; id is always assigned by the database.
+_IMPORT_COLUMNS = COMPANY_COLUMNS[1:]
+
+
+def _check_format(fmt: str) -> str:
+    fmt = (fmt or "").lower().lstrip(".")
+    if fmt not in ("csv", "parquet"):
+        raise ValueError(f"Unknown file format: {fmt!r} (use csv or parquet)")
+    if fmt == "parquet" and pq is None:
+        raise ImportError("Parquet export and import need pyarrow (pip install pyarrow)")
+    return fmt
+
+
+def iter_company_chunks(filters: dict | None = None, chunk_rows: int = TRANSFER_CHUNK_ROWS) -> Iterator[list[tuple]]:
+    """
+    Companies matching filters (same rules as query_companies), in id order, as lists of up to
+    chunk_rows tuples of COMPANY_COLUMNS. One query is read with fetchmany, so only one chunk
+    is in memory at a time and every chunk comes from the same snapshot of the table.
+    """
+    where, params = _filter_clause(filters)
+    cursor = get_connection().execute(f"SELECT {_SELECT_COLUMNS} FROM companies{where} ORDER BY id", params)
+    try:
+        while True:
+            rows = cursor.fetchmany(chunk_rows)
+            if not rows:
+                return
+            yield [tuple(r) for r in rows]
     finally:
-        conn.close()
+        cursor.close()
+
+
+def _parquet_schema():
+    return pa.schema([("id", pa.int64()), *((c, pa.string()) for c in COMPANY_COLUMNS[1:])])
+
+
+@metrics.timed("db.export_companies")
+def export_companies(dest: str | Path | BinaryIO, fmt: str = "csv", filters: dict | None = None,
+                     chunk_rows: int = TRANSFER_CHUNK_ROWS) -> int:
+    """
+    Write companies (all, or those matching filters) to dest, a path or a binary file, as CSV
+    (with a header row) or Parquet (one row group per chunk). The table is streamed chunk by
+    chunk, so memory use does not grow with its size. Returns the number of rows written.
+    """
+    fmt = _check_format(fmt)
+    written = 0
+    with ExitStack() as stack:
+        if isinstance(dest, (str, Path)):
+            dest = stack.enter_context(open(dest, "wb"))
+        if fmt == "csv":
+            text = io.TextIOWrapper(dest, encoding="utf-8", newline="")
+            writer = csv.writer(text)
+            writer.writerow(COMPANY_COLUMNS)
+            for rows in iter_company_chunks(filters, chunk_rows):
+                writer.writerows(rows)
+                written += len(rows)
+            text.flush()
+            text.detach()  # leave dest open for the caller
+        else:
+            schema = _parquet_schema()
+            with pq.ParquetWriter(dest, schema) as writer:
+                for rows in iter_company_chunks(filters, chunk_rows):
+                    columns = [pa.array(values, type=f.type) for values, f in zip(zip(*rows), schema)]
+                    writer.write_table(pa.Table.from_arrays(columns, schema=schema))
+                    written += len(rows)
+    return written
+
+
+def _import_columns(names) -> list[str]:
+    columns = [c for c in (names or []) if c in _IMPORT_COLUMNS]
+    if not columns:
+        raise ValueError(f"No company columns in file (expected some of: {', '.join(_IMPORT_COLUMNS)})")
+    return columns
+
+
+def _iter_file_chunks(source: BinaryIO, fmt: str, chunk_rows: int) -> Iterator[list[dict]]:
+    """Rows of a CSV or Parquet file as dicts of the importable columns, chunk_rows at a time."""
+    if fmt == "csv":
+        text = io.TextIOWrapper(source, encoding="utf-8-sig", newline="")
+        try:
+            reader = csv.DictReader(text)
+            columns = _import_columns(reader.fieldnames)
+            chunk = []
+            for row in reader:
+                chunk.append({c: row[c] for c in columns})
+                if len(chunk) >= chunk_rows:
+                    yield chunk
+                    chunk = []
+            if chunk:
+                yield chunk
+        finally:
+            text.detach()  # leave source open for the caller
+    else:
+        parquet = pq.ParquetFile(source)
+        columns = _import_columns(parquet.schema_arrow.names)
+        for batch in parquet.iter_batches(batch_size=chunk_rows, columns=columns):
+            yield batch.to_pylist()
+
+
+def _rows_without_url() -> set[tuple]:
+    """Contact fields of every stored row without a source URL, as _record_values gives them."""
+    return {tuple(row) for row in get_connection().execute(
+        """SELECT company_name, description, contact_email, contact_phone, contact_address, has_contact_form
+           FROM companies WHERE source_url_key = ''"""
+    )}
+
+
+@metrics.timed("db.import_companies")
+def import_companies(source: str | Path | BinaryIO, fmt: str = "csv", chunk_rows: int = TRANSFER_CHUNK_ROWS,
+                     on_progress: Callable[[int], None] | None = None) -> int:
+    """
+    Load company records from a CSV or Parquet file (a path or a binary file), such as one
+    written by export_companies. Columns are matched by name: id and unknown columns are
+    ignored, missing ones are left blank. The file is read chunk_rows at a time and each chunk
+    is saved with upsert_companies in one transaction, so the whole file is never in memory.
+    A row whose source URL is already stored updates it instead of adding a duplicate, but
+    keeps the stored scraped_at: importing a file is not a new scrape. New rows take the
+    file's scraped_at when present (else now). A row without a source URL is skipped when a
+    stored URL-less row (or an earlier one in the file) has the same contact fields, so
+    re-importing a file does not duplicate them. on_progress, if given, gets the number of rows read so far
+    after each chunk. Returns the number of rows read; chunks saved before an error stay saved.
+    """
+    fmt = _check_format(fmt)
+    loaded = 0
+    with ExitStack() as stack:
+        if isinstance(source, (str, Path)):
+            source = stack.enter_context(open(source, "rb"))
+        known_without_url = _rows_without_url()
+        for chunk in _iter_file_chunks(source, fmt, chunk_rows):
+            records = []
+            for row in chunk:
+                record = {k: "" if v is None else str(v).strip() for k, v in row.items()}
+                if not normalize_source_url(record.get("source_url")):
+                    fields = _record_values(record)[:6]
+                    if fields in known_without_url:
+                        continue
+                    known_without_url.add(fields)
+                records.append(record)
+            upsert_companies(records, refresh_scraped_at=False)
+            loaded += len(chunk)
+            if on_progress:
+                on_progress(loaded)
+    return loaded
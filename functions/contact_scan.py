@@ -0,0 +1,131 @@
+"""
+Linear-time scanners for contact details in page text.
+scan_text() runs one precompiled pattern over the text once and returns every email, phone and
+street-address candidate with its position and a confidence score; rank() orders candidates
+best first. Every repetition in the pattern is bounded and each alternative is anchored on a
+cheap first character (a digit, "+", "(" or an email character after a non-email one), so the
+regex engine does a bounded amount of work per position however long or hostile the text is.
+The old unanchored PHONE_REGEX / ADDRESS_REGEX could backtrack quadratically on long pages.
+"""
+import re
+from dataclasses import dataclass
+
+EMAIL, PHONE, ADDRESS = "email", "phone", "address"
+
+_EMAIL = (r"(?<![A-Za-z0-9._%+-])[A-Za-z0-9._%+-]{1,64}@[A-Za-z0-9-]{1,63}(?:\.[A-Za-z0-9-]{1,63}){0,8}"
+          r"\.[A-Za-z]{2,24}(?![A-Za-z])")
+_PHONE = r"(?<![\w+])\+?(?:\(\d{1,4}\)|\d)[\d\s().-]{7,22}\d(?!\d)"
+_STREET_SUFFIX = (r"(?i:street|st|avenue|ave|blvd|boulevard|road|rd|drive|dr|way|lane|ln|court|ct"
+                  r"|place|pl|parkway|pkwy|highway|hwy|square|sq|terrace)")
+# Street-name words: a word, an initial ("N."), or an ordinal ("5th"). Bare numbers and sentence ends
+# break the match, so "Room 8888. Visit 12 Oak Street" yields "12 Oak Street".
+_STREET_WORD = r"(?:[A-Za-z]\.|[A-Za-z][\w'-]{0,39}|\d{1,4}(?i:st|nd|rd|th))"
+# House number, up to five street-name words, a street suffix, then up to six capitalised or numeric
+# words of city / state / postcode (a full stop ends it).
+_ADDRESS = (r"\b\d{1,6}[A-Za-z]?(?:\s{1,4}" + _STREET_WORD + r"){0,5}?\s{1,4}" + _STREET_SUFFIX
+            + r"\b\.?(?:\s{0,3},?\s{0,3}[A-Z0-9][\w'-]{0,39}){0,6}")
+# Each alternative sits in a lookahead so candidates of different kinds may overlap.
+SCAN_REGEX = re.compile(rf"(?=(?P<{EMAIL}>{_EMAIL}))|(?=(?P<{PHONE}>{_PHONE}))|(?=(?P<{ADDRESS}>{_ADDRESS}))")
+EMAIL_REGEX = re.compile(_EMAIL)
+
+_POSTCODE_REGEX = re.compile(r"\b\d{5}(?:-\d{4})?\b|\b[A-Z]{1,2}\d[A-Z\d]?\s?\d[A-Z]{2}\b|\b[A-Z]\d[A-Z]\s?\d[A-Z]\d\b")
+_NOT_EMAIL_TLDS = {"png", "jpg", "jpeg", "gif", "svg", "webp", "css", "js"}
+_ROLE_MAILBOXES = {"info", "contact", "hello", "sales", "office", "enquiries", "inquiries", "support",
+                   "admin", "mail", "team", "help"}
+_PLACEHOLDER_DOMAINS = {"example.com", "example.org", "example.net", "domain.com", "email.com", "yourdomain.com"}
+_PHONE_CONTEXT = ("tel", "phone", "call", "mobile", "cell")
+# Characters before a phone number searched for words like "Tel:" or "Fax".
+_CONTEXT_CHARS = 24
+
+
+@dataclass(frozen=True)
+class Candidate:
+    """One possible contact value: kind (EMAIL/PHONE/ADDRESS), the text, its span, and a 0–1 confidence."""
+    kind: str
+    value: str
+    start: int
+    end: int
+    confidence: float
+    source: str = "text"
+
+
+def count_digits(value: str) -> int:
+    return sum(c.isdigit() for c in value)
+
+
+def email_confidence(value: str) -> float:
+    """0 for image-like names such as logo@2x.png; role mailboxes rank up, placeholders and no-reply down."""
+    local, _, domain = value.lower().partition("@")
+    if domain.rpartition(".")[2] in _NOT_EMAIL_TLDS:
+        return 0.0
+    confidence = 0.6
+    if local in _ROLE_MAILBOXES:
+        confidence += 0.2
+    if local.startswith(("noreply", "no-reply", "donotreply")) or domain in _PLACEHOLDER_DOMAINS:
+        confidence -= 0.4
+    return confidence
+
+
+def phone_confidence(value: str, before: str = "") -> float:
+    """0 unless the number has 10–15 digits; ranks up international format, grouping and a "Tel:"-like label."""
+    digits = count_digits(value)
+    if not 10 <= digits <= 15:
+        return 0.0
+    confidence = 0.5
+    if value.startswith("+"):
+        confidence += 0.15
+    if digits == len(value):
+        confidence -= 0.2 if digits > 11 else 0.0  # long unbroken digit runs are usually IDs
+    else:
+        confidence += 0.1
+    before = before.lower()
+    if any(word in before for word in _PHONE_CONTEXT):
+        confidence += 0.25
+    if "fax" in before:
+        confidence -= 0.2
+    return confidence
+
+
+def address_confidence(value: str) -> float:
+    """Ranks up addresses that carry a postcode and a comma-separated city part."""
+    confidence = 0.5
+    if _POSTCODE_REGEX.search(value):
+        confidence += 0.25
+    if "," in value:
+        confidence += 0.1
+    return confidence
+
+
+def scan_text(text: str) -> list[Candidate]:
+    """
+    Every email, phone and address candidate in text, in position order. A candidate that starts
+    inside an earlier one of the same kind is dropped, and values that fail their kind's basic
+    checks (phone digit count, image file names) are left out. A rejected match still covers its
+    span, so no suffix of it (say, the last digits of an over-long number) is taken instead.
+    """
+    found = []
+    last_end = {EMAIL: -1, PHONE: -1, ADDRESS: -1}
+    for m in SCAN_REGEX.finditer(text):
+        kind = m.lastgroup
+        start, end = m.span(kind)
+        if start < last_end[kind]:
+            continue
+        value = m.group(kind)
+        if kind == EMAIL:
+            confidence = email_confidence(value)
+        elif kind == PHONE:
+            confidence = phone_confidence(value, text[max(0, start - _CONTEXT_CHARS):start])
+        else:
+            value = value.rstrip(" ,.")
+            end = start + len(value)
+            confidence = address_confidence(value)
+        last_end[kind] = end
+        if confidence <= 0:
+            continue
+        found.append(Candidate(kind, value, start, end, round(min(confidence, 1.0), 2)))
+    return found
+
+
+def rank(candidates: list[Candidate]) -> list[Candidate]:
+    """Candidates best first: highest confidence, then earliest position, then original order."""
+    return sorted(candidates, key=lambda c: (-c.confidence, c.start))
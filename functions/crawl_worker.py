@@ -0,0 +1,128 @@
+"""
+Background worker for the app's discover and scrape jobs.
+The Home page queues jobs in the crawl_jobs table; a CrawlWorker (started once per server process
+by app_cache.get_crawl_worker) runs them on its own threads and stores results in crawl_job_items
+as they arrive. A crawl therefore keeps going across reruns and browser refreshes, several can
+run at once, and the page only polls the database.
+"""
+import json
+import threading
+import time
+
+from db import database
+from functions import fetcher
+from functions.scraper import DEFAULT_CONCURRENCY, MAX_CONCURRENCY, discover_site_urls, iter_scrape_urls
+
+# Jobs run at the same time (each one also fetches up to its own `concurrency` pages at once).
+DEFAULT_WORKERS = 3
+# How often idle worker threads look for new jobs (submit() wakes them sooner).
+POLL_SECONDS = 2.0
+# Partial results are written after this many items or this many seconds, whichever comes first.
+FLUSH_ITEMS = 10
+FLUSH_SECONDS = 1.0
+
+
+class JobCancelled(Exception):
+    """Raised inside a job once it has been cancelled (or deleted) in the database."""
+
+
+class _ItemWriter:
+    """Buffers a job's results and appends them to crawl_job_items in small batches."""
+
+    def __init__(self, job_id: int):
+        self.job_id = job_id
+        self.count = 0
+        self._buffer = []
+        self._last_flush = time.monotonic()
+
+    def add(self, item) -> None:
+        self._buffer.append(item)
+        self.count += 1
+        if len(self._buffer) >= FLUSH_ITEMS or time.monotonic() - self._last_flush >= FLUSH_SECONDS:
+            self.flush()
+
+    def flush(self) -> None:
+        self._last_flush = time.monotonic()
+        items, self._buffer = self._buffer, []
+        if items and not database.append_crawl_job_items(self.job_id, items):
+            raise JobCancelled()
+
+
+# Runners return the job's pages_found: pages discovered, or pages asked to be scraped.
+def _run_discover(job, params: dict, writer: _ItemWriter) -> int:
+    return len(discover_site_urls(job["start_url"], max_pages=params.get("max_pages", 50),
+                                  concurrency=params.get("concurrency", DEFAULT_CONCURRENCY),
+                                  use_sitemaps=params.get("use_sitemaps", True),
+                                  stop_when_complete=params.get("stop_when_complete", False),
+                                  dedupe_distance=params.get("dedupe_distance"), on_url=writer.add))
+
+
+def _run_scrape(job, params: dict, writer: _ItemWriter) -> int:
+    urls = params.get("urls", [])
+    for result in iter_scrape_urls(urls, concurrency=params.get("concurrency", DEFAULT_CONCURRENCY),
+                                   dedupe_distance=params.get("dedupe_distance")):
+        writer.add(result)
+    return len(urls)
+
+
+_RUNNERS = {database.JOB_DISCOVER: _run_discover, database.JOB_SCRAPE: _run_scrape}
+
+
+def run_job(job) -> None:
+    """Run one claimed job to completion, recording its results and final status."""
+    writer = _ItemWriter(job["id"])
+    try:
+        found = _RUNNERS[job["kind"]](job, json.loads(job["params"]), writer)
+        writer.flush()
+    except JobCancelled:
+        return
+    except Exception as e:
+        database.finish_crawl_job(job["id"], database.JOB_FAILED, pages_found=writer.count,
+                                  pages_saved=writer.count, error=str(e) or type(e).__name__)
+        return
+    database.finish_crawl_job(job["id"], database.JOB_DONE, pages_found=found, pages_saved=writer.count)
+
+
+class CrawlWorker:
+    """A small pool of daemon threads that claim and run app jobs until the process exits."""
+
+    def __init__(self, workers: int = DEFAULT_WORKERS):
+        self.workers = max(1, workers)
+        self._wake = threading.Event()
+        self._threads: list[threading.Thread] = []
+
+    def start(self) -> "CrawlWorker":
+        # Size the shared HTTP pool once, before any job runs: one host pool per concurrent job and
+        # enough connections per host for the highest concurrency a job can ask for.
+        fetcher.configure(pool_connections=max(fetcher.DEFAULT_POOL_CONNECTIONS, self.workers),
+                          pool_maxsize=MAX_CONCURRENCY)
+        # Jobs still marked running were cut off by a server restart: run them again from scratch.
+        database.requeue_crawl_jobs(kinds=database.APP_JOB_KINDS)
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._loop, name=f"crawl-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def submit(self, kind: str, start_url: str, params: dict, expected: int = 0) -> int:
+        """Queue a job and wake an idle thread. Returns the job id."""
+        job_id = database.submit_crawl_job(kind, start_url, params, expected)
+        self._wake.set()
+        return job_id
+
+    def _loop(self) -> None:
+        while True:
+            try:
+                job = database.claim_crawl_job(kinds=database.APP_JOB_KINDS)
+            except Exception:
+                # e.g. the database is locked for longer than busy_timeout; try again later.
+                job = None
+            if job is None:
+                self._wake.wait(POLL_SECONDS)
+                self._wake.clear()
+                continue
+            try:
+                run_job(job)
+            except Exception:
+                # The outcome could not be recorded; the job stays running until the next start requeues it.
+                pass
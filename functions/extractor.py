@@ -0,0 +1,183 @@
+"""
+Single-pass signal collection for scraped pages.
+collect_signals() walks the parse tree once and records everything the contact extractors need
+(page text, mailto/tel links, <address>, address-like classes, forms with their inputs and
+context text, iframes, title), so scraper._extract_contact and scraper._has_contact_form no
+longer re-walk the tree with separate find_all / get_text calls.
+"""
+import re
+from dataclasses import dataclass, field
+
+from bs4 import BeautifulSoup, CData, NavigableString, Tag
+
+# "html.parser" ships with Python and is what the extractors were written against.
+# "lxml" parses several times faster but builds a slightly different tree on broken markup.
+DEFAULT_PARSER = "html.parser"
+
+ADDRESS_CLASS_REGEX = re.compile(r"address|location|office", re.I)
+FORM_INPUT_TYPE_REGEX = re.compile(r"text|email|tel", re.I)
+_MAIN_STRING_TYPES = (NavigableString, CData)
+
+
+@dataclass
+class FormSignals:
+    """One <form>: its attributes, the text of its nearest non-empty ancestor, and its input names."""
+    action: str
+    form_id: str
+    form_class: str
+    parent_text: str
+    input_names: str
+
+
+@dataclass
+class PageSignals:
+    """Everything the contact extractors read from a page, gathered in one traversal."""
+    text: str = ""
+    title: str = ""
+    mailto_hrefs: list[str] = field(default_factory=list)
+    tel_hrefs: list[str] = field(default_factory=list)
+    address_text: str | None = None
+    address_class_texts: list[str] = field(default_factory=list)
+    forms: list[FormSignals] = field(default_factory=list)
+    iframes: list[tuple[str, str, str]] = field(default_factory=list)
+
+
+def parse_html(html: str, parser: str = DEFAULT_PARSER) -> BeautifulSoup:
+    """Parse page HTML with the given BeautifulSoup parser ("html.parser" or "lxml")."""
+    return BeautifulSoup(html, parser)
+
+
+def _join_range(strings: list[str], start: int, end: int, limit: int | None = None) -> str:
+    """Same as get_text(separator=" ", strip=True) for the strings in [start, end), optionally cut to limit chars."""
+    if limit is None:
+        return " ".join(strings[start:end])
+    parts, size = [], 0
+    for i in range(start, end):
+        parts.append(strings[i])
+        size += len(strings[i]) + 1
+        if size > limit:
+            break
+    return " ".join(parts)[:limit]
+
+
+def collect_signals(soup: BeautifulSoup) -> PageSignals:
+    """
+    Walk soup once and return its PageSignals.
+    Each tag's text is a contiguous slice of the page's stripped strings, so element texts are
+    taken from (start, end) offsets instead of calling get_text on every element of interest.
+    """
+    signals = PageSignals()
+    strings: list[str] = []
+    # Open tags as (tag, index of its first string); a tag closes when the walk leaves its subtree.
+    stack: list[tuple[Tag, int]] = []
+    ranges: dict[int, list[int]] = {}
+    address_tag = None
+    class_tags: list[Tag] = []
+    iframe_tags: list[Tag] = []
+    # Per form: (tag, ancestors nearest first, input tags); open_forms holds forms being walked.
+    form_entries: list[tuple[Tag, list[Tag], list[Tag]]] = []
+    open_forms: list[tuple[Tag, list[Tag], list[Tag]]] = []
+    title_tag = None
+
+    def close(tag: Tag) -> None:
+        span = ranges.get(id(tag))
+        if span is not None:
+            span[1] = len(strings)
+        if open_forms and open_forms[-1][0] is tag:
+            open_forms.pop()
+
+    for el in soup.descendants:
+        parent = el.parent
+        while stack and stack[-1][0] is not parent:
+            close(stack.pop()[0])
+        if isinstance(el, Tag):
+            name = el.name
+            attrs = el.attrs
+            stack.append((el, len(strings)))
+            if name == "a":
+                href = attrs.get("href")
+                if href is not None:
+                    prefix = href[:7].lower()
+                    if prefix == "mailto:":
+                        signals.mailto_hrefs.append(href)
+                    elif prefix[:4] == "tel:":
+                        signals.tel_hrefs.append(href)
+            elif name == "title" and title_tag is None:
+                title_tag = el
+            elif name == "address" and address_tag is None:
+                address_tag = el
+                ranges[id(el)] = [len(strings), None]
+            elif name == "form":
+                ancestors = [tag for tag, _ in reversed(stack[:-1])]
+                for tag, start in stack[:-1]:
+                    ranges.setdefault(id(tag), [start, None])
+                entry = (el, ancestors, [])
+                form_entries.append(entry)
+                open_forms.append(entry)
+            elif name == "iframe":
+                iframe_tags.append(el)
+            elif name in ("input", "textarea") and open_forms:
+                for entry in open_forms:
+                    input_type = attrs.get("type")
+                    if input_type is not None and FORM_INPUT_TYPE_REGEX.search(input_type):
+                        entry[2].append(el)
+                    if name == "textarea":
+                        entry[2].append(el)
+            classes = attrs.get("class")
+            if classes and any(ADDRESS_CLASS_REGEX.search(c) for c in classes):
+                class_tags.append(el)
+                ranges.setdefault(id(el), [len(strings), None])
+        elif type(el) in _MAIN_STRING_TYPES:
+            s = el.strip()
+            if s:
+                strings.append(s)
+    while stack:
+        close(stack.pop()[0])
+
+    def text_of(tag: Tag, limit: int | None = None) -> str:
+        if tag.interesting_string_types != Tag.MAIN_CONTENT_STRING_TYPES:
+            # <script>, <style>, <template>... count only their own string type; rare, use bs4 directly.
+            t = tag.get_text(separator=" ", strip=True)
+            return t if limit is None else t[:limit]
+        start, end = ranges[id(tag)]
+        return _join_range(strings, start, end, limit)
+
+    signals.text = " ".join(strings)
+    if title_tag is not None and title_tag.string:
+        signals.title = title_tag.string
+    if address_tag is not None:
+        signals.address_text = text_of(address_tag)
+    signals.address_class_texts = [text_of(tag) for tag in class_tags]
+    for form, ancestors, inputs in form_entries:
+        parent_text = ""
+        for parent in ancestors:
+            if not parent.name:
+                continue
+            if parent.interesting_string_types != Tag.MAIN_CONTENT_STRING_TYPES:
+                if parent.get_text(strip=True):
+                    parent_text = text_of(parent, 500).lower()
+                    break
+                continue
+            start, end = ranges[id(parent)]
+            if end > start:
+                parent_text = text_of(parent, 500).lower()
+                break
+        else:
+            if strings and soup.name:
+                parent_text = _join_range(strings, 0, len(strings), 500).lower()
+        form_class = form.get("class")
+        signals.forms.append(FormSignals(
+            action=(form.get("action") or "").lower(),
+            form_id=(form.get("id") or "").lower(),
+            form_class=" ".join(form_class).lower() if form_class else "",
+            parent_text=parent_text,
+            input_names=" ".join((inp.get("name") or inp.get("id") or "").lower() for inp in inputs),
+        ))
+    for iframe in iframe_tags:
+        iframe_class = iframe.get("class")
+        signals.iframes.append((
+            (iframe.get("src") or "").lower(),
+            (iframe.get("id") or "").lower(),
+            " ".join(iframe_class).lower() if iframe_class else "",
+        ))
+    return signals
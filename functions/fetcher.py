@@ -0,0 +1,225 @@
+"""
+Shared HTTP fetching for the scraper.
+One pooled requests.Session is reused for every fetch, so pages on the same host share
+keep-alive connections instead of paying a new TCP/TLS handshake per request.
+Bodies are streamed and capped at a maximum size, non-HTML responses are refused, and the
+charset is taken from the headers or the first few KB of the page rather than guessed.
+The response cache (functions/http_cache.py) is best-effort: if it cannot be read or written
+(locked, read-only or corrupt file), the failure is logged and the page is fetched uncached.
+"""
+import codecs
+import logging
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Iterator
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from functions import http_cache, metrics
+
+USER_AGENT = "Mozilla/5.0 (compatible; IndigoNode/1.0)"
+DEFAULT_TIMEOUT = 10
+# Number of hosts with cached connection pools, and connections kept open per host.
+DEFAULT_POOL_CONNECTIONS = 10
+DEFAULT_POOL_MAXSIZE = 16
+# Bytes read from a single response; anything beyond is dropped.
+DEFAULT_MAX_BYTES = 2 * 1024 * 1024
+HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml")
+# What a broken cache raises: SQLite errors from the cache file, zlib errors from a corrupt body.
+_CACHE_ERRORS = (sqlite3.Error, zlib.error)
+# How much of the body is searched for <meta charset>.
+CHARSET_SNIFF_BYTES = 4096
+_CHUNK_SIZE = 64 * 1024
+
+_META_CHARSET_REGEX = re.compile(rb"""<meta[^>]+charset\s*=\s*["']?\s*([a-zA-Z0-9_.:-]+)""", re.I)
+_BOMS = ((codecs.BOM_UTF8, "utf-8-sig"), (codecs.BOM_UTF16_LE, "utf-16"), (codecs.BOM_UTF16_BE, "utf-16"))
+
+try:
+    import brotli  # noqa: F401  (urllib3 decodes "br" only when brotli is installed)
+    ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    ACCEPT_ENCODING = "gzip, deflate"
+
+
+logger = logging.getLogger(__name__)
+
+
+class UnsupportedContentType(requests.RequestException):
+    """Response has a content type outside the allowlist (e.g. a PDF or image behind a page link)."""
+
+
+_session = None
+_session_lock = threading.Lock()
+_pool_connections = DEFAULT_POOL_CONNECTIONS
+_pool_maxsize = DEFAULT_POOL_MAXSIZE
+
+
+def _build_session() -> requests.Session:
+    session = requests.Session()
+    session.headers.update({"User-Agent": USER_AGENT, "Accept-Encoding": ACCEPT_ENCODING})
+    adapter = HTTPAdapter(pool_connections=_pool_connections, pool_maxsize=_pool_maxsize)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def configure(pool_connections: int = DEFAULT_POOL_CONNECTIONS, pool_maxsize: int = DEFAULT_POOL_MAXSIZE) -> None:
+    """Set connection pool sizes. The shared session is rebuilt on next use."""
+    global _session, _pool_connections, _pool_maxsize
+    with _session_lock:
+        _pool_connections = max(1, pool_connections)
+        _pool_maxsize = max(1, pool_maxsize)
+        if _session is not None:
+            _session.close()
+        _session = None
+
+
+def get_session() -> requests.Session:
+    """Return the shared pooled session (created on first use)."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = _build_session()
+        return _session
+
+
+@dataclass
+class FetchResult:
+    """Body of a fetched page. from_cache is True when the server answered 304 Not Modified."""
+    url: str
+    content: bytes
+    encoding: str | None
+    from_cache: bool = False
+
+    @property
+    def text(self) -> str:
+        try:
+            return self.content.decode(self.encoding or "utf-8", errors="replace")
+        except LookupError:
+            return self.content.decode("utf-8", errors="replace")
+
+
+def _valid_codec(name: str | None) -> str | None:
+    if not name:
+        return None
+    try:
+        return codecs.lookup(name).name
+    except LookupError:
+        return None
+
+
+def detect_encoding(content_type: str, head: bytes) -> str:
+    """
+    Pick the body encoding: charset in Content-Type, then a BOM, then <meta charset> /
+    http-equiv in the first CHARSET_SNIFF_BYTES bytes, else UTF-8.
+    """
+    for param in content_type.split(";")[1:]:
+        key, _, value = param.partition("=")
+        if key.strip().lower() == "charset":
+            encoding = _valid_codec(value.strip().strip("\"'"))
+            if encoding:
+                return encoding
+    for bom, encoding in _BOMS:
+        if head.startswith(bom):
+            return encoding
+    match = _META_CHARSET_REGEX.search(head[:CHARSET_SNIFF_BYTES])
+    if match:
+        encoding = _valid_codec(match.group(1).decode("ascii", "ignore"))
+        if encoding:
+            return encoding
+    return "utf-8"
+
+
+def _read_capped(resp: requests.Response, max_bytes: int) -> bytes:
+    """Read at most max_bytes of the (decompressed) body, then drop the connection's remainder."""
+    chunks, size = [], 0
+    for chunk in resp.iter_content(_CHUNK_SIZE):
+        chunks.append(chunk)
+        size += len(chunk)
+        if size >= max_bytes:
+            break
+    return b"".join(chunks)[:max_bytes]
+
+
+def _check_content_type(resp: requests.Response, url: str, content_types: tuple[str, ...]) -> str:
+    """Return the response's Content-Type, raising UnsupportedContentType if it is not allowed."""
+    content_type = resp.headers.get("Content-Type", "")
+    mime = content_type.split(";")[0].strip().lower()
+    if mime and content_types and mime not in content_types:
+        raise UnsupportedContentType(f"Unsupported content type {mime!r} for {url}")
+    return content_type
+
+
+def iter_content(url: str, timeout: float = DEFAULT_TIMEOUT, max_bytes: int = DEFAULT_MAX_BYTES,
+                 content_types: tuple[str, ...] = ()) -> Iterator[bytes]:
+    """
+    GET url on the shared session and yield the body in chunks as it arrives, up to max_bytes
+    (transfer encodings such as gzip are already decoded). Nothing is cached. Closing the
+    generator early drops the connection's remainder, so callers can stop once they have enough.
+    Raises requests.RequestException (or UnsupportedContentType) before the first chunk.
+    """
+    with get_session().get(url, timeout=timeout, stream=True) as resp:
+        resp.raise_for_status()
+        _check_content_type(resp, url, content_types)
+        size = 0
+        for chunk in resp.iter_content(_CHUNK_SIZE):
+            if size + len(chunk) >= max_bytes:
+                yield chunk[:max_bytes - size]
+                return
+            size += len(chunk)
+            yield chunk
+
+
+def _cache_call(fn, url: str, *args):
+    """Call an http_cache function; on a cache failure log it and return None (treated as a miss)."""
+    try:
+        return fn(url, *args)
+    except _CACHE_ERRORS as e:
+        metrics.count("cache_errors", host=urlsplit(url).netloc)
+        logger.warning("HTTP cache %s failed for %s: %s", fn.__name__, url, e)
+        return None
+
+
+def fetch(url: str, timeout: float = DEFAULT_TIMEOUT, use_cache: bool = True,
+          max_bytes: int = DEFAULT_MAX_BYTES, content_types: tuple[str, ...] = HTML_CONTENT_TYPES) -> FetchResult:
+    """
+    GET url on the shared session. With use_cache, a previously cached copy is revalidated
+    with If-None-Match / If-Modified-Since and reused on 304.
+    The body is streamed and cut at max_bytes. A Content-Type outside content_types raises
+    UnsupportedContentType before any of the body is read; a missing Content-Type is allowed.
+    Raises requests.RequestException on network or HTTP errors; cache failures are not raised.
+    """
+    host = urlsplit(url).netloc
+    start = time.perf_counter()
+    metrics.count("requests", host=host)
+    try:
+        cached = _cache_call(http_cache.lookup, url) if use_cache else None
+        headers = cached.conditional_headers() if cached else None
+        with get_session().get(url, timeout=timeout, headers=headers, stream=True) as resp:
+            # elapsed runs from sending the request to parsing the headers: DNS, connect, TLS and server time.
+            metrics.record("fetch.wait", resp.elapsed.total_seconds(), host)
+            if cached and resp.status_code == 304:
+                _cache_call(http_cache.touch, url)
+                metrics.count("cache_hits", host=host)
+                return FetchResult(url, cached.content, cached.encoding, from_cache=True)
+            resp.raise_for_status()
+            content_type = _check_content_type(resp, url, content_types)
+            with metrics.timer("fetch.download", host):
+                content = _read_capped(resp, max_bytes)
+        metrics.count("bytes_fetched", len(content), host=host)
+        encoding = detect_encoding(content_type, content)
+        if use_cache:
+            _cache_call(http_cache.store, url, content, encoding, resp.headers.get("ETag", ""),
+                        resp.headers.get("Last-Modified", ""))
+        return FetchResult(url, content, encoding)
+    except requests.RequestException:
+        metrics.count("errors", host=host)
+        raise
+    finally:
+        metrics.record("fetch", time.perf_counter() - start, host, url)
@@ -0,0 +1,147 @@
+"""
+Persistent HTTP response cache used by functions/fetcher.py.
+Bodies are stored zlib-compressed in SQLite next to the main database, together with the
+ETag / Last-Modified validators so repeat fetches can be revalidated with a conditional GET.
+Entries expire after a TTL; when the store grows past its size limit the least recently used
+entries are evicted.
+"""
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+
+CACHE_PATH = Path(__file__).resolve().parent.parent / "db" / "http_cache.db"
+DEFAULT_TTL = 7 * 24 * 3600
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+# Eviction runs after this many stores rather than on every write.
+_EVICT_EVERY = 50
+
+_local = threading.local()
+_lock = threading.Lock()
+_stores_since_evict = 0
+ttl = DEFAULT_TTL
+max_bytes = DEFAULT_MAX_BYTES
+
+
+@dataclass
+class CachedResponse:
+    """A cached page body plus the validators needed to revalidate it."""
+    content: bytes
+    encoding: str | None
+    etag: str
+    last_modified: str
+
+    def conditional_headers(self) -> dict:
+        """Request headers for a conditional GET against this entry."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+def _get_connection() -> sqlite3.Connection:
+    """Return this thread's cache connection, creating the table on first use."""
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect(CACHE_PATH, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                body BLOB,
+                encoding TEXT,
+                etag TEXT,
+                last_modified TEXT,
+                size INTEGER,
+                stored_at REAL,
+                accessed_at REAL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses(accessed_at)")
+        conn.commit()
+        _local.conn = conn
+    return conn
+
+
+def configure(ttl_seconds: float = DEFAULT_TTL, max_size_bytes: int = DEFAULT_MAX_BYTES) -> None:
+    """Set the entry TTL and the total compressed size limit."""
+    global ttl, max_bytes
+    ttl = ttl_seconds
+    max_bytes = max_size_bytes
+
+
+def lookup(url: str) -> CachedResponse | None:
+    """Return the cached entry for url if present and within its TTL."""
+    conn = _get_connection()
+    row = conn.execute(
+        "SELECT body, encoding, etag, last_modified, stored_at FROM responses WHERE url = ?", (url,)
+    ).fetchone()
+    if row is None:
+        return None
+    body, encoding, etag, last_modified, stored_at = row
+    if time.time() - stored_at > ttl:
+        return None
+    return CachedResponse(zlib.decompress(body), encoding, etag or "", last_modified or "")
+
+
+def touch(url: str) -> None:
+    """Mark an entry as revalidated (server answered 304): restarts its TTL and LRU clock."""
+    now = time.time()
+    conn = _get_connection()
+    conn.execute("UPDATE responses SET stored_at = ?, accessed_at = ? WHERE url = ?", (now, now, url))
+    conn.commit()
+
+
+def store(url: str, content: bytes, encoding: str | None, etag: str, last_modified: str) -> None:
+    """Save a response body. Responses without ETag or Last-Modified cannot be revalidated and are skipped."""
+    global _stores_since_evict
+    if not etag and not last_modified:
+        return
+    body = zlib.compress(content, 6)
+    if len(body) > max_bytes:
+        return
+    now = time.time()
+    conn = _get_connection()
+    conn.execute(
+        """INSERT OR REPLACE INTO responses (url, body, encoding, etag, last_modified, size, stored_at, accessed_at)
+           VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+        (url, body, encoding, etag or "", last_modified or "", len(body), now, now),
+    )
+    conn.commit()
+    with _lock:
+        _stores_since_evict += 1
+        due = _stores_since_evict >= _EVICT_EVERY
+        if due:
+            _stores_since_evict = 0
+    if due:
+        evict()
+
+
+def evict() -> None:
+    """Drop expired entries, then least recently used ones until the store fits in max_bytes."""
+    conn = _get_connection()
+    conn.execute("DELETE FROM responses WHERE stored_at < ?", (time.time() - ttl,))
+    total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+    if total > max_bytes:
+        excess = total - max_bytes
+        freed = 0
+        doomed = []
+        for url, size in conn.execute("SELECT url, size FROM responses ORDER BY accessed_at"):
+            doomed.append((url,))
+            freed += size
+            if freed >= excess:
+                break
+        conn.executemany("DELETE FROM responses WHERE url = ?", doomed)
+    conn.commit()
+
+
+def clear() -> None:
+    """Remove every cached response."""
+    conn = _get_connection()
+    conn.execute("DELETE FROM responses")
+    conn.commit()
@@ -0,0 +1,171 @@
+"""
+Lightweight in-process timing for the crawl pipeline, shown on the Performance page.
+Hooks in fetcher, scraper and db.database record durations per stage (fetch wait/download,
+parse, extract, DB calls) into fixed-bucket histograms, overall and per host, plus byte and
+cache counters and the slowest URLs. Per-host figures are kept for the HOSTS_KEPT most recently
+seen hosts only, so a long crawl over many sites does not grow memory without bound. Recording
+is a lock and a few additions, so it stays on; set `enabled = False` to turn it off. Figures
+cover this process since it started or since reset().
+"""
+import heapq
+import math
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import wraps
+
+# Histogram buckets grow by this factor from BUCKET_MIN seconds; quantiles are bucket upper bounds (~±6%).
+BUCKET_MIN = 0.00005
+BUCKET_FACTOR = 1.12
+BUCKET_COUNT = 160  # up to ~3.6 hours
+SLOWEST_KEPT = 25
+# Hosts with per-host figures; the least recently seen host is dropped beyond this.
+HOSTS_KEPT = 200
+
+enabled = True
+_lock = threading.Lock()
+
+
+class Histogram:
+    """Counts of durations in log-spaced buckets, with exact count, sum and max."""
+
+    __slots__ = ("buckets", "count", "total", "max")
+
+    def __init__(self):
+        self.buckets = [0] * BUCKET_COUNT
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds: float) -> None:
+        if seconds <= BUCKET_MIN:
+            index = 0
+        else:
+            index = min(BUCKET_COUNT - 1, math.ceil(math.log(seconds / BUCKET_MIN, BUCKET_FACTOR)))
+        self.buckets[index] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q: float) -> float:
+        """Approximate q-quantile in seconds (upper bound of the bucket holding it, capped at max)."""
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(q * self.count))
+        seen = 0
+        for index, n in enumerate(self.buckets):
+            seen += n
+            if seen >= rank:
+                return min(BUCKET_MIN * BUCKET_FACTOR ** index, self.max)
+        return self.max
+
+
+_started = time.time()
+_stages: dict[str, Histogram] = {}
+# host -> (histograms by stage, counters by name), least recently seen first.
+_hosts: OrderedDict[str, tuple[dict[str, Histogram], dict[str, float]]] = OrderedDict()
+_counters: dict[str, float] = {}
+_slowest: list[tuple[float, str, str]] = []  # min-heap of (seconds, stage, url)
+
+
+def _host(host: str) -> tuple[dict[str, Histogram], dict[str, float]]:
+    """A host's figures, marked as most recently seen (evicting the oldest host if over HOSTS_KEPT). Needs _lock."""
+    entry = _hosts.get(host)
+    if entry is None:
+        entry = _hosts[host] = ({}, {})
+        if len(_hosts) > HOSTS_KEPT:
+            _hosts.popitem(last=False)
+    else:
+        _hosts.move_to_end(host)
+    return entry
+
+
+def record(stage: str, seconds: float, host: str = "", url: str = "") -> None:
+    """Add one duration for a stage (and for its host, and to the slowest-URL list, when given)."""
+    if not enabled:
+        return
+    with _lock:
+        _stages.setdefault(stage, Histogram()).add(seconds)
+        if host:
+            _host(host)[0].setdefault(stage, Histogram()).add(seconds)
+        if url:
+            entry = (seconds, stage, url)
+            if len(_slowest) < SLOWEST_KEPT:
+                heapq.heappush(_slowest, entry)
+            elif entry > _slowest[0]:
+                heapq.heapreplace(_slowest, entry)
+
+
+def count(name: str, value: float = 1, host: str = "") -> None:
+    """Add to a counter such as bytes_fetched or cache_hits (also per host when given)."""
+    if not enabled:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+        if host:
+            counters = _host(host)[1]
+            counters[name] = counters.get(name, 0) + value
+
+
+@contextmanager
+def timer(stage: str, host: str = "", url: str = ""):
+    """Time the with-block as one sample of stage (recorded even if the block raises)."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(stage, time.perf_counter() - start, host, url)
+
+
+def timed(stage: str):
+    """Decorator form of timer() for functions such as the database helpers."""
+    def decorate(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with timer(stage):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def _summary(hist: Histogram) -> dict:
+    return {
+        "count": hist.count,
+        "p50_ms": hist.quantile(0.5) * 1000,
+        "p95_ms": hist.quantile(0.95) * 1000,
+        "max_ms": hist.max * 1000,
+        "total_s": hist.total,
+    }
+
+
+def snapshot() -> dict:
+    """
+    Copy of everything recorded: since (epoch seconds), stages {stage: summary},
+    hosts [{stage, host, ...summary}], counters, host_counters [{name, host, value}],
+    slowest [{stage, url, ms}] (slowest first). Per-host entries cover the retained hosts,
+    most recently seen first.
+    """
+    with _lock:
+        return {
+            "since": _started,
+            "stages": {stage: _summary(h) for stage, h in sorted(_stages.items())},
+            "hosts": [{"stage": stage, "host": host, **_summary(h)}
+                      for host, (stages, _) in reversed(_hosts.items()) for stage, h in sorted(stages.items())],
+            "counters": dict(_counters),
+            "host_counters": [{"name": n, "host": host, "value": v}
+                              for host, (_, counters) in reversed(_hosts.items()) for n, v in sorted(counters.items())],
+            "slowest": [{"stage": stage, "url": url, "ms": s * 1000} for s, stage, url in sorted(_slowest, reverse=True)],
+        }
+
+
+def reset() -> None:
+    """Forget everything recorded so far."""
+    global _started
+    with _lock:
+        _started = time.time()
+        _stages.clear()
+        _hosts.clear()
+        _counters.clear()
+        _slowest.clear()
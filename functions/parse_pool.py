@@ -0,0 +1,79 @@
+"""
+Shared process pool for the CPU-bound half of scraping: HTML parsing and contact extraction.
+Fetching stays on threads, which is fine for I/O, but BeautifulSoup and the extractors are pure
+Python and would share one core under the GIL. Fetched pages are therefore handed to worker
+processes as raw bytes and come back as small results (a scrape dict, or a page's links), so
+parsing scales with the machine's cores. With one worker (or on a single-core machine) the
+work runs in the calling thread instead and no processes are started.
+"""
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable
+
+from functions import metrics
+
+DEFAULT_WORKERS = os.cpu_count() or 1
+
+_pool = None
+_pool_lock = threading.Lock()
+_workers = DEFAULT_WORKERS
+
+
+def configure(workers: int = DEFAULT_WORKERS) -> None:
+    """Set the number of parse processes (1 parses in the calling thread). The pool is rebuilt on next use."""
+    global _pool, _workers
+    with _pool_lock:
+        _workers = max(1, workers)
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def _get_pool() -> ProcessPoolExecutor | None:
+    """The shared pool (started on first use), or None when parsing runs in-thread."""
+    global _pool
+    with _pool_lock:
+        if _workers <= 1:
+            return None
+        if _pool is None:
+            # Not fork: the app and batch runs fork from a process with live threads (fetchers, Streamlit).
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            _pool = ProcessPoolExecutor(max_workers=_workers, mp_context=multiprocessing.get_context(method))
+        return _pool
+
+
+def _reset_broken(pool: ProcessPoolExecutor) -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+
+
+def submit(fn: Callable, *args) -> Future:
+    """
+    Run fn(*args) on the pool and return its Future. fn must be a module-level function and
+    its arguments and result picklable. Without a pool the call runs now and the Future is
+    already done. If a worker process died, the pool is replaced and the call resubmitted once.
+    """
+    pool = _get_pool()
+    if pool is None:
+        future = Future()
+        try:
+            future.set_result(fn(*args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+    try:
+        return pool.submit(fn, *args)
+    except BrokenProcessPool:
+        _reset_broken(pool)
+        return submit(fn, *args)
+
+
+def record_timings(timings: dict[str, float], host: str) -> None:
+    """Record stage timings measured inside a worker process, which has its own (unread) metrics."""
+    for stage, seconds in timings.items():
+        metrics.record(stage, seconds, host)
@@ -2,67 +2,81 @@
 Web scraping logic for company contact information.
 Extracts: company name (from URL), description (page title), email, phone, address, source URL.
 """
+import heapq
+import itertools
 import re
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from typing import Callable, Iterator
+
 import requests
 from bs4 import BeautifulSoup
 from urllib.parse import urlparse, urljoin, urlunparse
 
-EMAIL_REGEX = re.compile(r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}")
-PHONE_REGEX = re.compile(r"\+?[\d\s\-().]{10,}")
-ADDRESS_REGEX = re.compile(
-    r"\d+[\s\w.-]+(?:street|st|avenue|ave|blvd|boulevard|road|rd|drive|dr|way|lane|ln|court|ct)\.?\s*[,\s]*[\w\s.-]+",
+from functions import fetcher, parse_pool, simhash, sitemap
+from functions.contact_scan import ADDRESS, EMAIL, EMAIL_REGEX, PHONE, Candidate, count_digits, rank, scan_text
+from functions.extractor import DEFAULT_PARSER, PageSignals, collect_signals, parse_html
+
+# Number of pages fetched at once during discovery and batch scraping.
+DEFAULT_CONCURRENCY = 8
+# Most pages the app lets a single job fetch at once.
+MAX_CONCURRENCY = 16
+# Longest robots.txt Crawl-delay honoured during discovery, in seconds.
+MAX_CRAWL_DELAY = 10.0
+# Words in a link's path or anchor text that point at contact details, with their weight in score_link.
+LINK_KEYWORDS = {
+    "contact": 10, "kontakt": 10, "impressum": 9, "imprint": 9, "about": 6,
+    "location": 5, "team": 4, "office": 4, "find-us": 4, "support": 2,
+}
+LOW_VALUE_PATH_REGEX = re.compile(r"blog|news|post|article|tag|categor|archive|product|shop|cart|login|/\d{3,}")
+# Contact fields that goal-mode discovery looks for, in _extract_contact order plus the form flag.
+CONTACT_GOAL = ("email", "phone", "address", "form")
+# Sitemap URLs read and scored by discovery; sitemaps can list tens of thousands.
+SITEMAP_SCORE_LIMIT = 2000
+# With dedupe, link discovery fetches at most this many pages per page it may list.
+DEDUPE_FETCH_FACTOR = 3
+
+FORM_EMBED_REGEX = re.compile(
+    r"wufoo|typeform|jotform|google\.com/forms|forms\.office\.com|formstack|hubspot.*form|form",
     re.I,
 )
 
 
-def _extract_contact(soup: BeautifulSoup, text: str) -> tuple[str, str, str]:
-    """Extract email, phone, and address from page. Returns (email, phone, address)."""
-    email, phone, address = "", "", ""
-
-    for a in soup.find_all("a", href=re.compile(r"^mailto:", re.I)):
-        href = a.get("href", "")
-        if "?" in href:
-            href = href.split("?")[0]
-        addr = href.replace("mailto:", "").strip()
-        if addr and EMAIL_REGEX.match(addr):
-            email = addr[:200]
-            break
-    if not email:
-        match = EMAIL_REGEX.search(text)
-        if match:
-            email = match.group(0)[:200]
-
-    for a in soup.find_all("a", href=re.compile(r"^tel:", re.I)):
-        raw = a.get("href", "").replace("tel:", "").strip()
-        digits = re.sub(r"\D", "", raw)
-        if len(digits) >= 10:
-            phone = raw[:50]
-            break
-    if not phone:
-        for m in PHONE_REGEX.finditer(text):
-            digits = re.sub(r"\D", "", m.group(0))
-            if len(digits) >= 10:
-                phone = m.group(0).strip()[:50]
-                break
-
-    addr_tag = soup.find("address")
-    if addr_tag:
-        address = addr_tag.get_text(separator=" ", strip=True)[:300]
-    if not address:
-        for el in soup.find_all(class_=re.compile(r"address|location|office", re.I)):
-            t = el.get_text(separator=" ", strip=True)
-            if 10 < len(t) < 400:
-                address = t[:300]
-                break
-    if not address:
-        match = ADDRESS_REGEX.search(text)
+def contact_candidates(signals: PageSignals) -> list[Candidate]:
+    """
+    Every email, phone and address candidate on a page, best first. mailto:/tel: links and the
+    <address> element outrank address-like class texts, which outrank matches in the page text.
+    """
+    found = []
+    for href in signals.mailto_hrefs:
+        match = EMAIL_REGEX.match(href[len("mailto:"):].split("?")[0].strip())
         if match:
-            address = match.group(0).strip()[:300]
+            found.append(Candidate(EMAIL, match.group(0), -1, -1, 1.0, "mailto"))
+    for href in signals.tel_hrefs:
+        raw = href[len("tel:"):].strip()
+        if count_digits(raw) >= 10:
+            found.append(Candidate(PHONE, raw, -1, -1, 1.0, "tel"))
+    if signals.address_text:
+        found.append(Candidate(ADDRESS, signals.address_text, -1, -1, 1.0, "address_tag"))
+    for t in signals.address_class_texts:
+        if 10 < len(t) < 400:
+            found.append(Candidate(ADDRESS, t, -1, -1, 0.9, "address_class"))
+    found += scan_text(signals.text)
+    return rank(found)
 
-    return (email or "", phone or "", address or "")
 
+def _extract_contact(signals: PageSignals) -> tuple[str, str, str]:
+    """Extract email, phone, and address from page signals. Returns (email, phone, address)."""
+    best = {}
+    for candidate in contact_candidates(signals):
+        best.setdefault(candidate.kind, candidate.value)
+    return (best.get(EMAIL, "")[:200], best.get(PHONE, "")[:50], best.get(ADDRESS, "")[:300])
 
-def _has_contact_form(soup: BeautifulSoup, url: str) -> str:
+
+def _has_contact_form(signals: PageSignals, url: str) -> str:
     """
     Detect if the page has a form or embedded form (e.g. iframe), and if it looks like a contact form.
     Returns "Yes" if the page has a form (or form iframe) and context suggests contact, else "No".
@@ -71,36 +85,19 @@ def _has_contact_form(soup: BeautifulSoup, url: str) -> str:
     path_has_contact = "contact" in url_lower
 
     # 1) In-page <form> elements
-    forms = soup.find_all("form")
-    if forms:
-        for form in forms:
-            action = (form.get("action") or "").lower()
-            form_id = (form.get("id") or "").lower()
-            form_class = " ".join(form.get("class", [])).lower() if form.get("class") else ""
-            parent_text = ""
-            for parent in form.parents:
-                if parent.name and parent.get_text(strip=True):
-                    parent_text = parent.get_text(separator=" ", strip=True)[:500].lower()
-                    break
-            if path_has_contact or "contact" in action or "contact" in form_id or "contact" in form_class or "contact" in parent_text:
+    if signals.forms:
+        for form in signals.forms:
+            if (path_has_contact or "contact" in form.action or "contact" in form.form_id
+                    or "contact" in form.form_class or "contact" in form.parent_text):
                 return "Yes"
-            inputs = form.find_all(["input", "textarea"], type=re.compile(r"text|email|tel", re.I))
-            inputs += form.find_all("textarea")
-            names = " ".join((inp.get("name") or inp.get("id") or "").lower() for inp in inputs)
+            names = form.input_names
             if "email" in names or "message" in names or "name" in names:
                 return "Yes"
         return "Yes" if path_has_contact else "No"
 
     # 2) Embedded form via iframe (Wufoo, Typeform, Jotform, Google Forms, etc.)
-    form_embed_pattern = re.compile(
-        r"wufoo|typeform|jotform|google\.com/forms|forms\.office\.com|formstack|hubspot.*form|form",
-        re.I,
-    )
-    for iframe in soup.find_all("iframe"):
-        src = (iframe.get("src") or "").lower()
-        iframe_id = (iframe.get("id") or "").lower()
-        iframe_class = " ".join(iframe.get("class", [])).lower() if iframe.get("class") else ""
-        if form_embed_pattern.search(src) or form_embed_pattern.search(iframe_id) or form_embed_pattern.search(iframe_class):
+    for src, iframe_id, iframe_class in signals.iframes:
+        if FORM_EMBED_REGEX.search(src) or FORM_EMBED_REGEX.search(iframe_id) or FORM_EMBED_REGEX.search(iframe_class):
             return "Yes"
         # iframe with "form" in id/class and we're on a contact-like URL
         if path_has_contact and ("form" in iframe_id or "form" in iframe_class or "form" in src):
@@ -109,31 +106,40 @@ def _has_contact_form(soup: BeautifulSoup, url: str) -> str:
     return "No"
 
 
-def scrape_url(url: str) -> dict:
+def scrape_url(url: str, parser: str = DEFAULT_PARSER) -> dict:
     """
     Scrape a URL for company contact information.
     Returns: company_name, description, contact_email, contact_phone, contact_address, has_contact_form, source_url.
     """
     try:
-        resp = requests.get(url, timeout=10, headers={"User-Agent": "Mozilla/5.0 (compatible; IndigoNode/1.0)"})
-        resp.raise_for_status()
+        resp = fetcher.fetch(url)
     except requests.RequestException as e:
         raise ValueError(f"Failed to fetch URL: {e}") from e
+    return scrape_html(resp.text, url, parser)
+
+
+def scrape_html(html: str, url: str, parser: str = DEFAULT_PARSER) -> dict:
+    """Extract the scrape_url fields from already fetched page HTML."""
+    result, timings = _scrape_html(html, url, parser)
+    parse_pool.record_timings(timings, urlparse(url).netloc)
+    return result
 
-    soup = BeautifulSoup(resp.text, "html.parser")
-    text = soup.get_text(separator=" ", strip=True)
+
+def _scrape_html(html: str, url: str, parser: str) -> tuple[dict, dict[str, float]]:
+    """scrape_html without recording metrics: the fields, plus seconds spent in parse and extract."""
+    start = time.perf_counter()
+    soup = parse_html(html, parser)
+    parsed = time.perf_counter()
 
     netloc = urlparse(url).netloc.replace("www.", "")
     company_name = (netloc.split(".")[0] if netloc else "") or "unknown"
 
-    description = ""
-    if soup.title and soup.title.string:
-        description = soup.title.string.strip()[:500]
-
-    contact_email, contact_phone, contact_address = _extract_contact(soup, text)
-    has_contact_form = _has_contact_form(soup, url)
+    signals = collect_signals(soup)
+    description = signals.title.strip()[:500]
+    contact_email, contact_phone, contact_address = _extract_contact(signals)
+    has_contact_form = _has_contact_form(signals, url)
 
-    return {
+    result = {
         "company_name": company_name,
         "description": description,
         "contact_email": contact_email,
@@ -142,6 +148,12 @@ def scrape_url(url: str) -> dict:
         "has_contact_form": has_contact_form,
         "source_url": url,
     }
+    return result, {"parse": parsed - start, "extract": time.perf_counter() - parsed}
+
+
+def _scrape_fetched(content: bytes, encoding: str | None, url: str, parser: str) -> tuple[dict, dict[str, float]]:
+    """Parse stage of iter_scrape_urls, run in a parse process: raw page bytes in, scrape fields out."""
+    return _scrape_html(fetcher.FetchResult(url, content, encoding).text, url, parser)
 
 
 def _normalize_url(url: str, base: str) -> str:
@@ -154,58 +166,370 @@ def _normalize_url(url: str, base: str) -> str:
     return urlunparse((parsed.scheme, parsed.netloc, path, "", "", ""))
 
 
-def _same_domain_links(soup: BeautifulSoup, base_url: str) -> set[str]:
-    """Extract absolute same-domain links from page."""
-    base_netloc = urlparse(base_url).netloc.replace("www.", "")
-    seen = set()
+def _same_domain(url: str, base_url: str) -> bool:
+    return urlparse(url).netloc.replace("www.", "") == urlparse(base_url).netloc.replace("www.", "")
+
+
+def score_link(url: str, anchor_text: str = "") -> int:
+    """
+    How likely a link leads to contact details, from its path and anchor text. Higher is better;
+    deep paths and blog/shop-style paths score lower.
+    """
+    path = urlparse(url).path.lower()
+    anchor = anchor_text.lower()
+    score = 0
+    for word, weight in LINK_KEYWORDS.items():
+        if word in path:
+            score += weight
+        if word in anchor:
+            score += weight
+    if LOW_VALUE_PATH_REGEX.search(path):
+        score -= 5
+    return score - path.count("/")
+
+
+class _Frontier:
+    """URLs waiting to be fetched, best score first; equal scores keep discovery order (plain BFS)."""
+
+    def __init__(self):
+        self._heap: list[tuple[int, int, str]] = []
+        self._seq = itertools.count()
+
+    def push(self, url: str, anchor_text: str = "") -> None:
+        heapq.heappush(self._heap, (-score_link(url, anchor_text), next(self._seq), url))
+
+    def pop(self) -> str:
+        return heapq.heappop(self._heap)[2]
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+
+@dataclass
+class _Page:
+    """
+    A fetched page's same-domain links (URL -> anchor text) and, when asked for, its contact fields.
+    A near-duplicate of an earlier page is not parsed: it has duplicate_of set and nothing else.
+    """
+    ok: bool
+    links: dict[str, str] = field(default_factory=dict)
+    contact: tuple[str, str, str, str] | None = None  # email, phone, address, has_contact_form
+    duplicate_of: str = ""
+
+
+def _same_domain_links(soup: BeautifulSoup, base_url: str) -> dict[str, str]:
+    """Extract absolute same-domain links from page, each with the text of the anchors pointing to it."""
+    seen = {}
     for a in soup.find_all("a", href=True):
         href = a["href"].strip()
         if not href or href.startswith(("#", "mailto:", "tel:", "javascript:")):
             continue
         full = _normalize_url(href, base_url)
-        if not full:
-            continue
-        netloc = urlparse(full).netloc.replace("www.", "")
-        if netloc != base_netloc:
+        if not full or not _same_domain(full, base_url):
             continue
-        seen.add(full)
+        text = a.get_text(" ", strip=True)
+        seen[full] = f"{seen[full]} {text}" if seen.get(full) else text
     return seen
 
 
-def discover_site_urls(start_url: str, max_pages: int = 50) -> list[str]:
-    """BFS crawl from start_url, collecting same-domain URLs up to max_pages."""
+def _parse_page(content: bytes, encoding: str | None, url: str, extract_contact: bool,
+                parser: str = DEFAULT_PARSER) -> tuple[_Page, dict[str, float]]:
+    """
+    Parse stage of discovery, run in a parse process: a fetched page's links, plus its contact
+    fields if extract_contact, and the seconds spent in each step.
+    """
+    start = time.perf_counter()
+    soup = parse_html(fetcher.FetchResult(url, content, encoding).text, parser)
+    parsed = time.perf_counter()
+    page = _Page(ok=True, links=_same_domain_links(soup, url))
+    linked = time.perf_counter()
+    timings = {"parse": parsed - start, "extract.links": linked - parsed}
+    if extract_contact:
+        signals = collect_signals(soup)
+        page.contact = (*_extract_contact(signals), _has_contact_form(signals, url))
+        timings["extract"] = time.perf_counter() - linked
+    return page, timings
+
+
+def _fetch_page(url: str, extract_contact: bool = False,
+                duplicates: simhash.NearDuplicateIndex | None = None) -> Future | _Page:
+    """
+    Fetch one page and queue it on the parse pool; the Future gives _parse_page's result. Returns
+    a _Page instead when fetching failed, or when the page is a near-duplicate of one already in
+    duplicates (then it is not parsed).
+    """
+    try:
+        resp, original = _fetch_unique(url, duplicates)
+    except requests.RequestException:
+        return _Page(ok=False)
+    if original:
+        return _Page(ok=True, duplicate_of=original)
+    return parse_pool.submit(_parse_page, resp.content, resp.encoding, url, extract_contact, DEFAULT_PARSER)
+
+
+def _fetch_unique(url: str, duplicates: simhash.NearDuplicateIndex | None) -> tuple[fetcher.FetchResult, str]:
+    """
+    Fetch url, plus the URL of an earlier near-duplicate page from duplicates ("" if none or no
+    index). A URL that looks like it leads to contact details (positive score_link) is never
+    treated as a duplicate, so a contact page is not lost to one that merely shares its layout.
+    """
+    resp = fetcher.fetch(url)
+    if duplicates is None or score_link(url) > 0:
+        return resp, ""
+    return resp, duplicates.check(simhash.fingerprint(resp.text), url) or ""
+
+
+def _page_result(url: str, parsing: Future | _Page) -> _Page:
+    """Wait for a page queued by _fetch_page and record its parse timings."""
+    if isinstance(parsing, _Page):
+        return parsing
+    try:
+        page, timings = parsing.result()
+    except BrokenProcessPool:
+        return _Page(ok=False)
+    parse_pool.record_timings(timings, urlparse(url).netloc)
+    return page
+
+
+def discover_site_urls(start_url: str, max_pages: int = 50, concurrency: int = DEFAULT_CONCURRENCY,
+                       on_url: Callable[[str], None] | None = None, use_sitemaps: bool = True,
+                       stop_when_complete: bool = False, dedupe_distance: int | None = None) -> list[str]:
+    """
+    Collect up to max_pages same-domain URLs, starting with start_url.
+    robots.txt is read first: disallowed URLs are skipped and, with use_sitemaps, up to
+    SITEMAP_SCORE_LIMIT URLs are read from the site's sitemaps, which needs a handful of
+    requests instead of one per page. They are merged with the start page's own links (its
+    navigation often reaches pages a long sitemap lists late, or not at all) and the best
+    max_pages by score_link are kept, most promising first. When the sitemaps list no usable
+    URL, links are followed from start_url, most promising first, at most one page at a time
+    and Crawl-delay apart if robots.txt asks.
+
+    With stop_when_complete, pages are fetched best-first (sitemap URLs included) and contact
+    fields are extracted as they arrive; the crawl stops once an email, phone, address and
+    contact form have all been seen, or after max_pages fetches. The result is then the pages
+    that were fetched, which is usually only a few.
+
+    With dedupe_distance, every page found by following links is fetched before it is listed,
+    and one whose main-text SimHash is within that many bits of an earlier page's (see
+    functions.simhash) is dropped without being parsed (unless score_link rates its URL), freeing its place for another link;
+    at most DEDUPE_FETCH_FACTOR * max_pages pages are fetched. Sitemap URLs are not fetched
+    here; they are only checked when scraped (see iter_scrape_urls).
+    on_url, if given, is called with each URL as it is found (with dedupe_distance, a followed
+    link once its page has been fetched and is not a duplicate); an exception from it stops
+    the crawl.
+    """
     start_url = _normalize_url(start_url, start_url)
     if not start_url:
         return []
-    headers = {"User-Agent": "Mozilla/5.0 (compatible; IndigoNode/1.0)"}
-    to_visit = [start_url]
-    visited = {start_url}
+    robots = sitemap.read_robots(start_url)
+    duplicates = simhash.NearDuplicateIndex(dedupe_distance) if dedupe_distance is not None else None
+    if stop_when_complete:
+        return _find_contact_pages(start_url, max_pages, concurrency, on_url, use_sitemaps, robots, duplicates)
     urls = [start_url]
+    visited = {start_url}
+    skipped: set[str] = set()
+    reported: set[str] = set()
 
-    while to_visit and len(urls) < max_pages:
-        url = to_visit.pop(0)
-        try:
-            resp = requests.get(url, timeout=10, headers=headers)
-            resp.raise_for_status()
-        except requests.RequestException:
-            continue
-        soup = BeautifulSoup(resp.text, "html.parser")
-        for link in _same_domain_links(soup, url):
+    def report(link: str) -> None:
+        if on_url and link not in reported:
+            reported.add(link)
+            on_url(link)
+
+    def add(link: str, fetched_later: bool = False) -> None:
+        visited.add(link)
+        urls.append(link)
+        if not (fetched_later and duplicates):
+            report(link)
+
+    # The start page is fetched first, so it is never a duplicate.
+    report(start_url)
+    if use_sitemaps:
+        anchors = {link: "" for link in itertools.islice(_iter_sitemap_links(start_url, robots), SITEMAP_SCORE_LIMIT)
+                   if link not in visited}
+        if anchors:
+            start_page = _page_result(start_url, _fetch_page(start_url, duplicates=duplicates))
+            for link in sorted(start_page.links):
+                if link not in visited and robots.allows(link):
+                    anchors[link] = start_page.links[link] or anchors.get(link, "")
+            # Stable sort: equal scores keep sitemap order, then the start page's link order.
+            for link in sorted(anchors, key=lambda link: -score_link(link, anchors[link]))[:max_pages - 1]:
+                add(link)
+            return urls
+    if len(urls) >= max_pages:
+        return urls
+
+    frontier = _Frontier()
+    frontier.push(start_url)
+
+    held: deque[tuple[str, str]] = deque()  # (link, anchor text) not listed yet because the list was full
+
+    def on_page(url: str, page: _Page) -> bool:
+        if page.duplicate_of:
+            skipped.add(url)
+        else:
+            report(url)
+            # Sort for a stable order; set iteration order varies between runs.
+            held.extend((link, page.links[link]) for link in sorted(page.links))
+        # A skipped duplicate frees a place for a held-back link.
+        while held and not full():
+            link, anchor = held.popleft()
+            if link not in visited and robots.allows(link):
+                add(link, fetched_later=True)
+                frontier.push(link, anchor)
+        # Without dedupe the listed links need not be fetched; with it, finish checking them.
+        return bool(duplicates) or not full()
+
+    def full() -> bool:
+        return len(urls) - len(skipped) >= max_pages or len(urls) >= fetch_limit
+
+    fetch_limit = max_pages * DEDUPE_FETCH_FACTOR if duplicates else max_pages
+    _crawl(frontier, concurrency, robots, on_page, duplicates=duplicates)
+    return [u for u in urls if u not in skipped]
+
+
+def _iter_sitemap_links(start_url: str, robots: sitemap.RobotsInfo) -> Iterator[str]:
+    """Normalized, same-domain, allowed URLs from the site's sitemaps."""
+    locs = sitemap.iter_sitemap_urls(start_url, robots)
+    try:
+        for loc in locs:
+            link = _normalize_url(loc, start_url)
+            if link and _same_domain(link, start_url) and robots.allows(link):
+                yield link
+    finally:
+        locs.close()
+
+
+def _find_contact_pages(start_url: str, max_pages: int, concurrency: int, on_url: Callable[[str], None] | None,
+                        use_sitemaps: bool, robots: sitemap.RobotsInfo,
+                        duplicates: simhash.NearDuplicateIndex | None = None) -> list[str]:
+    """Goal mode of discover_site_urls: fetch best-first until every contact field is found."""
+    frontier = _Frontier()
+    frontier.push(start_url)
+    visited = {start_url}
+    if use_sitemaps:
+        for link in itertools.islice(_iter_sitemap_links(start_url, robots), SITEMAP_SCORE_LIMIT):
             if link not in visited:
                 visited.add(link)
-                to_visit.append(link)
-                urls.append(link)
-                if len(urls) >= max_pages:
-                    break
-    return urls
-
-
-def scrape_urls(url_list: list[str]) -> list[dict]:
-    """Scrape each URL for contact info. Returns list of results; skips failures."""
-    results = []
-    for u in url_list:
-        try:
-            results.append(scrape_url(u))
-        except ValueError:
-            continue
+                frontier.push(link)
+    pages: list[str] = []
+    found: set[str] = set()
+    fetched = 0
+
+    def on_page(url: str, page: _Page) -> bool:
+        nonlocal fetched
+        fetched += 1
+        if page.ok and not page.duplicate_of:
+            pages.append(url)
+            if on_url:
+                on_url(url)
+            for name, value in zip(CONTACT_GOAL, page.contact):
+                if value and value != "No":
+                    found.add(name)
+        if len(found) == len(CONTACT_GOAL) or fetched >= max_pages:
+            return False
+        for link in sorted(page.links):
+            if link not in visited and robots.allows(link):
+                visited.add(link)
+                frontier.push(link, page.links[link])
+        return True
+
+    _crawl(frontier, concurrency, robots, on_page, extract_contact=True, duplicates=duplicates)
+    return pages
+
+
+def _crawl(frontier: _Frontier, concurrency: int, robots: sitemap.RobotsInfo,
+           on_page: Callable[[str, _Page], bool], extract_contact: bool = False,
+           duplicates: simhash.NearDuplicateIndex | None = None) -> None:
+    """
+    Fetch pages from the frontier until it is empty or on_page(url, page) returns False.
+    Up to `concurrency` pages are fetched at once (one, Crawl-delay apart, if robots.txt sets a
+    delay) and parsed on the parse pool, except near-duplicates of pages already in duplicates.
+    Pages are handed to on_page as they finish, so a slow page does not hold up the others.
+    Queued work is cancelled when the crawl stops, including when on_page raises.
+    """
+    delay = min(robots.crawl_delay or 0, MAX_CRAWL_DELAY)
+    workers = 1 if delay else max(1, concurrency)
+    pending: dict[Future, tuple[str, bool]] = {}  # future -> (url, True once it is the parse stage)
+    fetching = 0
+    next_fetch = 0.0
+    pool = ThreadPoolExecutor(max_workers=workers)
+    try:
+        while frontier or pending:
+            while frontier and fetching < workers:
+                if delay:
+                    time.sleep(max(0.0, next_fetch - time.monotonic()))
+                    next_fetch = time.monotonic() + delay
+                url = frontier.pop()
+                pending[pool.submit(_fetch_page, url, extract_contact, duplicates)] = (url, False)
+                fetching += 1
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            # Several can finish together: take them in submission order for a stable crawl order.
+            for future in [f for f in pending if f in done]:
+                url, parsing = pending.pop(future)
+                if not parsing:
+                    fetching -= 1
+                    fetched = future.result()
+                    if isinstance(fetched, Future):
+                        pending[fetched] = (url, True)
+                        continue
+                    future = fetched
+                if not on_page(url, _page_result(url, future)):
+                    return
+    finally:
+        for future in pending:
+            future.cancel()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def iter_scrape_urls(url_list: list[str], concurrency: int = DEFAULT_CONCURRENCY,
+                     dedupe_distance: int | None = None) -> Iterator[dict]:
+    """
+    Scrape URLs in parallel and yield each result as soon as it is ready (completion order).
+    Up to `concurrency` pages are fetched at once on threads; each fetched page is then parsed
+    on the parse pool while the threads move on. Failures are skipped, as in scrape_urls.
+    With dedupe_distance, a page whose text SimHash is within that many bits of a page fetched
+    earlier in this call is skipped as well, before it is parsed (see functions.simhash).
+    """
+    if not url_list:
+        return
+    duplicates = simhash.NearDuplicateIndex(dedupe_distance) if dedupe_distance is not None else None
+    pool = ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(url_list))))
+    pending: dict[Future, tuple[str, bool]] = {}  # future -> (url, True once it is the parse stage)
+    try:
+        for u in url_list:
+            pending[pool.submit(_fetch_unique, u, duplicates)] = (u, False)
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                url, parsing = pending.pop(future)
+                try:
+                    result = future.result()
+                except (requests.RequestException, BrokenProcessPool):
+                    continue
+                if not parsing:
+                    resp, original = result
+                    if original:
+                        continue
+                    parse = parse_pool.submit(_scrape_fetched, resp.content, resp.encoding, url, DEFAULT_PARSER)
+                    pending[parse] = (url, True)
+                    continue
+                record, timings = result
+                parse_pool.record_timings(timings, urlparse(url).netloc)
+                yield record
+    finally:
+        # Caller may stop iterating early: drop queued work instead of waiting for it.
+        for future in pending:
+            future.cancel()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def scrape_urls(url_list: list[str], concurrency: int = DEFAULT_CONCURRENCY,
+                dedupe_distance: int | None = None) -> list[dict]:
+    """
+    Scrape each URL for contact info. Returns list of results in input order; skips failures
+    (and, with dedupe_distance, near-duplicate pages as in iter_scrape_urls).
+    """
+    order = {u: i for i, u in enumerate(url_list)}
+    results = list(iter_scrape_urls(url_list, concurrency=concurrency, dedupe_distance=dedupe_distance))
+    results.sort(key=lambda r: order.get(r["source_url"], len(order)))
     return results
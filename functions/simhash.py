@@ -0,0 +1,128 @@
+"""
+Near-duplicate page detection for a crawl (paginated listings, tag pages, locale variants).
+fingerprint() reduces a page's main text to a 64-bit SimHash over overlapping word triples,
+so pages that differ in only a few words get fingerprints a few bits apart. Navigation, header
+and footer text is left out: shared boilerplate would otherwise bring distinct pages (a contact
+page and an about page) within a few bits of each other. It works on the raw HTML, before the
+page is parsed, so a duplicate can be dropped without parsing or extracting it.
+NearDuplicateIndex holds the fingerprints seen so far in one crawl. It splits each fingerprint
+into max_distance + 1 bands: two fingerprints within max_distance bits agree exactly on at least
+one band, so a lookup only compares against pages sharing a band instead of every page.
+"""
+import re
+import threading
+import zlib
+
+import numpy as np
+
+FINGERPRINT_BITS = 64
+SHINGLE_WORDS = 3
+# Pages with fewer words are never treated as duplicates (empty or script-only pages would all match).
+MIN_WORDS = 20
+# Default number of differing bits (of 64) at which two pages still count as near-duplicates.
+DEFAULT_MAX_DISTANCE = 3
+
+# Elements whose text is not part of the page's main content.
+_HIDDEN_TAGS = ("script", "style", "noscript", "template", "nav", "header", "footer", "aside")
+_WORD_REGEX = re.compile(r"\w+")
+
+
+def page_words(html: str) -> list[str]:
+    """
+    Lowercased words of the page's main text: no markup, and nothing inside script/style or
+    nav/header/footer/aside elements (one linear pass).
+    """
+    parts = html.split("<")
+    text = [parts[0]]
+    hidden = ""
+    depth = 0  # open elements named `hidden`, for nested ones such as a header inside an article's header
+    for part in parts[1:]:
+        tag, closed, rest = part.partition(">")
+        if not closed:
+            if not hidden:
+                text.append(part)  # a literal "<" in text
+            continue
+        name = tag.split(None, 1)[0].lower() if tag.strip() else ""
+        if hidden:
+            if name == hidden:
+                depth += 1
+            elif name == "/" + hidden:
+                depth -= 1
+                if not depth:
+                    hidden = ""
+                    text.append(rest)
+            continue
+        if name in _HIDDEN_TAGS:
+            hidden, depth = name, 1
+            continue
+        text.append(rest)
+    return _WORD_REGEX.findall(" ".join(text).lower())
+
+
+def _mix(x: np.ndarray) -> np.ndarray:
+    """splitmix64 finalizer: spreads every input bit over the whole 64-bit value."""
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+def fingerprint(html: str) -> int | None:
+    """SimHash of the page's main text, or None when it has fewer than MIN_WORDS words."""
+    words = page_words(html)
+    if len(words) < MIN_WORDS:
+        return None
+    # Each distinct word is hashed once (CRC-32, spread to 64 bits by _mix); a shingle's hash
+    # mixes the hashes of its words in order.
+    vocabulary = {w: zlib.crc32(w.encode()) for w in set(words)}
+    word_hashes = np.array([vocabulary[w] for w in words], dtype=np.uint64)
+    n = len(words) - SHINGLE_WORDS + 1
+    with np.errstate(over="ignore"):
+        word_hashes = _mix(word_hashes)
+        shingles = np.zeros(n, dtype=np.uint64)
+        for offset in range(SHINGLE_WORDS):
+            shingles = _mix(shingles ^ word_hashes[offset:offset + n])
+    unique, weights = np.unique(shingles, return_counts=True)
+    bits = np.unpackbits(unique.astype(">u8").view(np.uint8).reshape(-1, 8), axis=1)
+    # Each shingle votes +weight for the bits set in its hash and -weight for the others.
+    weights = weights.astype(np.float64)
+    votes = 2 * (weights @ bits.astype(np.float64)) - weights.sum()
+    return int.from_bytes(np.packbits(votes > 0).tobytes(), "big")
+
+
+def distance(a: int, b: int) -> int:
+    """Number of bits in which two fingerprints differ."""
+    return (a ^ b).bit_count()
+
+
+class NearDuplicateIndex:
+    """Fingerprints of one crawl's pages, each with its URL. Safe to share between fetch threads."""
+
+    def __init__(self, max_distance: int = DEFAULT_MAX_DISTANCE):
+        self.max_distance = max(0, min(max_distance, FINGERPRINT_BITS - 1))
+        bands = self.max_distance + 1
+        widths = [FINGERPRINT_BITS // bands + (i < FINGERPRINT_BITS % bands) for i in range(bands)]
+        shifts = [sum(widths[i + 1:]) for i in range(bands)]
+        self._bands = [(shift, (1 << width) - 1) for shift, width in zip(shifts, widths)]
+        self._tables: list[dict[int, list[tuple[int, str]]]] = [{} for _ in self._bands]
+        self._lock = threading.Lock()
+
+    def _find(self, fp: int) -> str | None:
+        for (shift, mask), table in zip(self._bands, self._tables):
+            for other, url in table.get((fp >> shift) & mask, ()):
+                if distance(fp, other) <= self.max_distance:
+                    return url
+        return None
+
+    def check(self, fp: int | None, url: str) -> str | None:
+        """
+        URL of an earlier page within max_distance bits of fp; otherwise fp is remembered for
+        url and None is returned. A None fingerprint (too little text) is never a duplicate.
+        """
+        if fp is None:
+            return None
+        with self._lock:
+            original = self._find(fp)
+            if original is None:
+                for (shift, mask), table in zip(self._bands, self._tables):
+                    table.setdefault((fp >> shift) & mask, []).append((fp, url))
+            return original
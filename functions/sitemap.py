@@ -0,0 +1,121 @@
+"""
+robots.txt and sitemap reading for URL discovery.
+read_robots() fetches a site's robots.txt once (Sitemap directives, Crawl-delay, Allow/Disallow);
+iter_sitemap_urls() streams the listed sitemaps (or /sitemap.xml), following sitemap indexes and
+inflating .xml.gz files on the fly, and yields page URLs without fetching the pages themselves.
+Parsing is incremental, so a caller that stops after enough URLs never downloads the rest.
+"""
+import zlib
+from collections import deque
+from dataclasses import dataclass
+from typing import Iterator
+from urllib.parse import urlparse
+from urllib.robotparser import RobotFileParser
+from xml.etree import ElementTree
+
+import requests
+
+from functions import fetcher
+
+# Product token matched against User-agent lines in robots.txt.
+ROBOTS_USER_AGENT = "IndigoNode"
+ROBOTS_MAX_BYTES = 512 * 1024
+ROBOTS_CONTENT_TYPES = ("text/plain",)
+# Limits per discovery run: sitemap files fetched (an index can list thousands) and
+# decompressed bytes read from any one file (the sitemap protocol allows up to 50 MB).
+MAX_SITEMAP_FILES = 20
+SITEMAP_MAX_BYTES = 50 * 1024 * 1024
+SITEMAP_CONTENT_TYPES = ("application/xml", "text/xml", "application/x-gzip", "application/gzip",
+                         "application/octet-stream", "text/plain")
+_GZIP_MAGIC = b"\x1f\x8b"
+
+
+@dataclass
+class RobotsInfo:
+    """What discovery needs from robots.txt. A missing or unreadable file allows everything."""
+    sitemaps: list[str]
+    crawl_delay: float | None = None
+    rules: RobotFileParser | None = None
+
+    def allows(self, url: str) -> bool:
+        return self.rules is None or self.rules.can_fetch(ROBOTS_USER_AGENT, url)
+
+
+def _origin(url: str) -> str:
+    parsed = urlparse(url)
+    return f"{parsed.scheme}://{parsed.netloc}"
+
+
+def read_robots(site_url: str, timeout: float = fetcher.DEFAULT_TIMEOUT) -> RobotsInfo:
+    """Fetch and parse robots.txt for the site of site_url."""
+    try:
+        resp = fetcher.fetch(f"{_origin(site_url)}/robots.txt", timeout=timeout,
+                             max_bytes=ROBOTS_MAX_BYTES, content_types=ROBOTS_CONTENT_TYPES)
+    except requests.RequestException:
+        return RobotsInfo(sitemaps=[])
+    rules = RobotFileParser()
+    rules.parse(resp.text.splitlines())
+    delay = rules.crawl_delay(ROBOTS_USER_AGENT)
+    return RobotsInfo(sitemaps=list(rules.site_maps() or []),
+                      crawl_delay=float(delay) if delay is not None else None, rules=rules)
+
+
+def _local_name(tag: str) -> str:
+    return tag.rpartition("}")[2]
+
+
+def iter_sitemap_entries(sitemap_url: str, timeout: float = fetcher.DEFAULT_TIMEOUT) -> Iterator[tuple[str, str]]:
+    """
+    Stream one sitemap or sitemap index and yield (kind, loc) pairs, where kind is "url" for a
+    page and "sitemap" for a child sitemap. Gzip files are inflated as they download.
+    Raises requests.RequestException, ElementTree.ParseError or zlib.error on bad input.
+    """
+    parser = ElementTree.XMLPullParser(events=("end",))
+    inflate = None
+    size = 0
+    chunks = fetcher.iter_content(sitemap_url, timeout=timeout, max_bytes=SITEMAP_MAX_BYTES,
+                                  content_types=SITEMAP_CONTENT_TYPES)
+    try:
+        for i, chunk in enumerate(chunks):
+            if i == 0 and chunk.startswith(_GZIP_MAGIC):
+                inflate = zlib.decompressobj(16 + zlib.MAX_WBITS)
+            if inflate is not None:
+                chunk = inflate.decompress(chunk, SITEMAP_MAX_BYTES - size)
+            size += len(chunk)
+            parser.feed(chunk)
+            for _, el in parser.read_events():
+                kind = _local_name(el.tag)
+                if kind not in ("url", "sitemap"):
+                    continue
+                for child in el:
+                    if _local_name(child.tag) == "loc" and child.text and child.text.strip():
+                        yield kind, child.text.strip()
+                        break
+                el.clear()
+            if size >= SITEMAP_MAX_BYTES:
+                return
+    finally:
+        chunks.close()
+
+
+def iter_sitemap_urls(site_url: str, robots: RobotsInfo, timeout: float = fetcher.DEFAULT_TIMEOUT) -> Iterator[str]:
+    """
+    Page URLs listed in the site's sitemaps (those named in robots.txt, else /sitemap.xml),
+    in document order, following sitemap indexes breadth-first up to MAX_SITEMAP_FILES files.
+    URLs are yielded as they are parsed, unfiltered; a sitemap that fails is skipped.
+    """
+    queue = deque(robots.sitemaps or [f"{_origin(site_url)}/sitemap.xml"])
+    seen = set()
+    while queue and len(seen) < MAX_SITEMAP_FILES:
+        sitemap_url = queue.popleft()
+        if sitemap_url in seen:
+            continue
+        seen.add(sitemap_url)
+        try:
+            for kind, loc in iter_sitemap_entries(sitemap_url, timeout):
+                if kind == "sitemap":
+                    queue.append(loc)
+                else:
+                    yield loc
+        except (requests.RequestException, ElementTree.ParseError, zlib.error):
+            continue
@@ -2,13 +2,17 @@
 Company Information page: Search for a company and edit its information.
 """
 import streamlit as st
+import sqlite3
 import sys
 import pandas as pd
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
-from db.database import update_company, delete_company
-from app_cache import get_cached_companies, clear_companies_cache
+from db.database import update_company, delete_company, search_companies
+from app_cache import get_cached_companies
+
+# Search shows the best-ranked matches only.
+SEARCH_LIMIT = 50
 
 
 def _str(val):
@@ -50,24 +54,15 @@ else:
     # Compute filtered list and selection (needed for both columns)
     search_query = st.session_state.get("ci_search", "")
     if search_query and str(search_query).strip():
-        q = str(search_query).strip().lower()
-        mask = (
-            df["company_name"].fillna("").astype(str).str.lower().str.contains(q, regex=False)
-            | df["contact_email"].fillna("").astype(str).str.lower().str.contains(q, regex=False)
-            | df["contact_phone"].fillna("").astype(str).str.contains(q, regex=False)
-        )
-        filtered_df = df.loc[mask]
+        filtered_df = search_companies(str(search_query).strip(), limit=SEARCH_LIMIT)
     else:
         filtered_df = df
 
     _placeholder = "— Select a company —"
     options = {_placeholder: None}
-    if not filtered_df.empty:
-        for _, row in filtered_df.iterrows():
-            rid = row.get("id")
-            if pd.notna(rid) and rid is not None:
-                name = _str(row.get("company_name", "?"))
-                options[f"ID {int(rid)} — {name}"] = int(rid)
+    for rid, name in zip(filtered_df["id"], filtered_df["company_name"]):
+        if pd.notna(rid) and rid is not None:
+            options[f"ID {int(rid)} — {_str(name)}"] = int(rid)
     option_keys = list(options.keys())
 
     col_search, col_card = st.columns([1, 2])
@@ -76,7 +71,7 @@ else:
         st.subheader("Search & filter")
         search_query = st.text_input(
             "Search",
-            placeholder="Search by company name, email, or phone…",
+            placeholder="Search by company name, description, email, phone, or address…",
             key="ci_search",
         )
         if filtered_df.empty:
@@ -117,23 +112,25 @@ else:
                 if not company_name or not company_name.strip():
                     st.error("Company name is required.")
                 else:
-                    update_company(
-                        company_id=chosen_id,
-                        company_name=company_name.strip(),
-                        description=(description or "").strip(),
-                        contact_email=(contact_email or "").strip(),
-                        contact_phone=(contact_phone or "").strip(),
-                        contact_address=(contact_address or "").strip(),
-                        has_contact_form=has_contact_form or "No",
-                        source_url=(source_url or "").strip(),
-                    )
-                    clear_companies_cache()
-                    st.session_state["company_info_save_success"] = True
-                    st.rerun()
+                    try:
+                        update_company(
+                            company_id=chosen_id,
+                            company_name=company_name.strip(),
+                            description=(description or "").strip(),
+                            contact_email=(contact_email or "").strip(),
+                            contact_phone=(contact_phone or "").strip(),
+                            contact_address=(contact_address or "").strip(),
+                            has_contact_form=has_contact_form or "No",
+                            source_url=(source_url or "").strip(),
+                        )
+                    except sqlite3.IntegrityError:
+                        st.error("Another company already uses this source URL.")
+                    else:
+                        st.session_state["company_info_save_success"] = True
+                        st.rerun()
 
             if delete_clicked:
                 delete_company(chosen_id)
-                clear_companies_cache()
                 st.session_state["company_info_delete_success"] = True
                 st.rerun()
         else:
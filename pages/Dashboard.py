@@ -3,11 +3,11 @@ Dashboard page: Contact data overview.
 """
 import streamlit as st
 import sys
-import pandas as pd
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
-from app_cache import get_cached_companies
+from db.database import get_dashboard_stats
+from app_cache import init_db_once
 
 st.set_page_config(page_title="Dashboard", page_icon="📊", layout="wide")
 st.markdown("""
@@ -21,20 +21,32 @@ st.markdown("""
 """, unsafe_allow_html=True)
 st.title("Dashboard")
 
-df = get_cached_companies()
+init_db_once()
+stats = get_dashboard_stats()
 
-if df is not None and not df.empty:
-    st.metric("Total companies", len(df))
+if stats["total"] > 0:
+    st.metric("Total companies", stats["total"])
 
     col1, col2, col3 = st.columns(3)
     with col1:
-        with_email = (df["contact_email"].fillna("").astype(str).str.strip() != "").sum() if "contact_email" in df.columns else 0
-        st.metric("With email", int(with_email))
+        st.metric("With email", stats["with_email"])
     with col2:
-        with_phone = (df["contact_phone"].fillna("").astype(str).str.strip() != "").sum() if "contact_phone" in df.columns else 0
-        st.metric("With phone", int(with_phone))
+        st.metric("With phone", stats["with_phone"])
     with col3:
-        with_address = (df["contact_address"].fillna("").astype(str).str.strip() != "").sum() if "contact_address" in df.columns else 0
-        st.metric("With address", int(with_address))
+        st.metric("With address", stats["with_address"])
+
+    chart_col1, chart_col2 = st.columns(2)
+    with chart_col1:
+        st.subheader("Top domains")
+        if not stats["domains"].empty:
+            st.bar_chart(stats["domains"].set_index("domain")["total"])
+        else:
+            st.caption("No source URLs yet.")
+    with chart_col2:
+        st.subheader("Companies scraped per day")
+        if not stats["daily"].empty:
+            st.bar_chart(stats["daily"].set_index("day")["total"])
+        else:
+            st.caption("No scrape dates yet.")
 else:
     st.info("No data yet. Scrape URLs from the Home page to see the dashboard.")
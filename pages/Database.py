@@ -2,14 +2,87 @@
 Database page: View & query SQLite data.
 """
 import streamlit as st
+import sqlite3
 import sys
+import tempfile
+import time
 import pandas as pd
 from pathlib import Path
 
 # Add project root to path
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
-from db.database import delete_company, update_company
-from app_cache import get_cached_companies, clear_companies_cache
+from db.database import (IMPORT_ERRORS, TRANSFER_FORMATS, count_companies, delete_company, export_companies,
+                         import_companies, query_companies, update_companies)
+from app_cache import init_db_once
+
+PAGE_SIZES = [25, 50, 100, 250]
+EXPORT_MIME = {"csv": "text/csv", "parquet": "application/vnd.apache.parquet"}
+# Export files live here until downloaded; ones left behind by closed sessions are removed after EXPORT_MAX_AGE seconds.
+EXPORT_DIR = Path(tempfile.gettempdir()) / "indigonode-exports"
+EXPORT_MAX_AGE = 3600
+
+
+def _remove_stale_exports():
+    """Delete export files older than EXPORT_MAX_AGE (from sessions that never downloaded them)."""
+    cutoff = time.time() - EXPORT_MAX_AGE
+    for path in EXPORT_DIR.glob("companies-*"):
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def _discard_export():
+    """Delete this session's export file."""
+    export = st.session_state.pop("export_file", None)
+    if export:
+        Path(export[0]).unlink(missing_ok=True)
+
+
+def _export_reader(path: str):
+    """Download data for the export at path: read when the button is clicked, then deleted."""
+    def read() -> bytes:
+        try:
+            return Path(path).read_bytes()
+        finally:
+            Path(path).unlink(missing_ok=True)
+    return read
+
+
+def _export_section():
+    """Export the whole table to a temporary file, then offer it for download."""
+    fmt = st.radio("Format", TRANSFER_FORMATS, horizontal=True, format_func=str.upper, key="export_format")
+    _remove_stale_exports()
+    if st.button("Prepare export"):
+        _discard_export()
+        EXPORT_DIR.mkdir(exist_ok=True)
+        with tempfile.NamedTemporaryFile(prefix="companies-", suffix=f".{fmt}", dir=EXPORT_DIR, delete=False) as f:
+            rows = export_companies(f, fmt)
+        st.session_state["export_file"] = (f.name, fmt, rows)
+    export = st.session_state.get("export_file")
+    if export and Path(export[0]).exists():
+        path, fmt, rows = export
+        # The file is only read when the button is clicked, not on every rerun. Streamlit then holds
+        # the whole file in memory while serving it: writing the export streams, the download does not.
+        st.download_button(f"Download {rows} rows ({fmt.upper()})", _export_reader(path), file_name=f"companies.{fmt}",
+                           mime=EXPORT_MIME[fmt], on_click=lambda: st.session_state.pop("export_file", None))
+
+
+def _import_section():
+    """Load a CSV/Parquet file in chunks; rows whose source URL is already stored are updated."""
+    uploaded = st.file_uploader("CSV or Parquet file with the export's column names", type=list(TRANSFER_FORMATS))
+    if uploaded is not None and st.button("Import"):
+        progress = st.empty()
+        try:
+            rows = import_companies(uploaded, Path(uploaded.name).suffix,
+                                    on_progress=lambda n: progress.caption(f"Imported {n} rows…"))
+        except IMPORT_ERRORS as e:
+            st.error(f"Import stopped: {e}")
+        else:
+            st.success(f"Imported {rows} row(s).")
+            st.rerun()
+
 
 def _str(val):
     """Coerce value to str for DB; NaN/None -> ''."""
@@ -31,8 +104,8 @@ st.markdown("""
 """, unsafe_allow_html=True)
 st.title("Database")
 
-df = get_cached_companies()
-if df is not None and not df.empty:
+init_db_once()
+if count_companies() > 0:
     # Filter at the top
     st.subheader("Filter")
     col1, col2 = st.columns(2)
@@ -40,24 +113,26 @@ if df is not None and not df.empty:
         company_filter = st.text_input("Company name contains", placeholder="e.g. Acme")
     with col2:
         email_filter = st.text_input("Email contains", placeholder="e.g. @company.com")
+    filters = {"company_name": company_filter, "contact_email": email_filter}
 
-    if company_filter or email_filter:
-        mask = pd.Series(True, index=df.index)
-        if company_filter:
-            mask &= df["company_name"].fillna("").astype(str).str.contains(company_filter, case=False, regex=False)
-        if email_filter:
-            mask &= df["contact_email"].fillna("").astype(str).str.contains(email_filter, case=False, regex=False)
-        filtered_df = df.loc[mask]
-        if filtered_df.empty:
-            st.info("No matches.")
-            display_df = pd.DataFrame()
-            rows_for_delete = []
-        else:
-            display_df = filtered_df.copy()
-            rows_for_delete = filtered_df.to_dict("records")
+    matches = count_companies(filters)
+    if matches == 0:
+        st.info("No matches.")
+        display_df = pd.DataFrame()
+        rows_for_delete = []
     else:
-        display_df = df.copy()
-        rows_for_delete = df.to_dict("records") if "id" in df.columns else []
+        size_col, page_col, _ = st.columns([1, 1, 4])
+        with size_col:
+            page_size = st.selectbox("Rows per page", PAGE_SIZES, index=1, key="db_page_size")
+        page_count = max(1, -(-matches // page_size))
+        # A narrower filter or bigger page size can leave the stored page out of range.
+        st.session_state["db_page"] = min(st.session_state.get("db_page", 1), page_count)
+        with page_col:
+            page = st.number_input("Page", min_value=1, max_value=page_count, step=1, key="db_page")
+        offset = (int(page) - 1) * page_size
+        display_df = query_companies(filters, limit=page_size, offset=offset)
+        st.caption(f"Rows {offset + 1}–{offset + len(display_df)} of {matches}")
+        rows_for_delete = display_df.to_dict("records")
 
     # Editable grid (id and scraped_at read-only)
     if not display_df.empty:
@@ -68,30 +143,40 @@ if df is not None and not df.empty:
             column_config["id"] = st.column_config.NumberColumn("ID", disabled=True)
         if "scraped_at" in display_df.columns:
             column_config["scraped_at"] = st.column_config.TextColumn("Scraped at", disabled=True)
+        # One editor state per page/filter, so pending edits never land on another page's rows.
+        editor_key = f"database_editor_{page}_{page_size}_{company_filter}_{email_filter}"
         edited_df = st.data_editor(
             display_df,
             use_container_width=True,
             num_rows="fixed",
             column_config=column_config or None,
-            key="database_editor",
+            key=editor_key,
         )
         if st.button("Save changes to database"):
-            for _, row in edited_df.iterrows():
+            # Only rows the user touched: data_editor reports them by position in display_df.
+            edited_rows = st.session_state.get(editor_key, {}).get("edited_rows", {})
+            changed = []
+            for pos in edited_rows:
+                row = edited_df.iloc[int(pos)]
                 rid = row.get("id")
                 if rid is not None and pd.notna(rid):
-                    update_company(
-                        company_id=int(rid),
-                        company_name=_str(row.get("company_name")),
-                        description=_str(row.get("description")),
-                        contact_email=_str(row.get("contact_email")),
-                        contact_phone=_str(row.get("contact_phone")),
-                        contact_address=_str(row.get("contact_address")),
-                        has_contact_form=_str(row.get("has_contact_form")) or "No",
-                        source_url=_str(row.get("source_url")),
-                    )
-            clear_companies_cache()
-            st.success("Changes saved.")
-            st.rerun()
+                    changed.append({
+                        "id": int(rid),
+                        "company_name": _str(row.get("company_name")),
+                        "description": _str(row.get("description")),
+                        "contact_email": _str(row.get("contact_email")),
+                        "contact_phone": _str(row.get("contact_phone")),
+                        "contact_address": _str(row.get("contact_address")),
+                        "has_contact_form": _str(row.get("has_contact_form")) or "No",
+                        "source_url": _str(row.get("source_url")),
+                    })
+            try:
+                update_companies(changed)
+            except sqlite3.IntegrityError:
+                st.error("Not saved: two companies would share the same source URL.")
+            else:
+                st.success(f"Saved {len(changed)} changed row(s).")
+                st.rerun()
 
     # Delete rows section
     if rows_for_delete:
@@ -103,8 +188,14 @@ if df is not None and not df.empty:
                 ids = [options[k] for k in to_delete]
                 for i in ids:
                     delete_company(i)
-                clear_companies_cache()
                 st.success(f"Deleted {len(ids)} row(s).")
                 st.rerun()
 else:
-    st.info("No data yet. Scrape URLs from the Home page to populate contact data.")
+    st.info("No data yet. Scrape URLs from the Home page to populate contact data, or import a file below.")
+
+st.subheader("Export / import")
+export_col, import_col = st.columns(2)
+with export_col:
+    _export_section()
+with import_col:
+    _import_section()
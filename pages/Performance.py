@@ -0,0 +1,97 @@
+"""
+Performance page: where crawl time goes (fetch, parse, extract, database), per stage and per host.
+"""
+import streamlit as st
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from functions import metrics
+
+STAGE_LABELS = {
+    "fetch": "Fetch (total)",
+    "fetch.wait": "Fetch: DNS/connect + server wait",
+    "fetch.download": "Fetch: download body",
+    "parse": "Parse (BeautifulSoup)",
+    "extract": "Extract contact fields",
+    "extract.links": "Extract links (discovery)",
+}
+
+# Hosts listed by default in the per-host table, most recently crawled first.
+RECENT_HOSTS_SHOWN = 25
+
+st.set_page_config(page_title="Performance", page_icon="⏱️", layout="wide")
+st.markdown("""
+<style>
+    .main .block-container {
+        max-width: 100%;
+        padding-left: 2rem;
+        padding-right: 2rem;
+    }
+</style>
+""", unsafe_allow_html=True)
+st.title("Performance")
+
+snap = metrics.snapshot()
+since = datetime.fromtimestamp(snap["since"]).strftime("%Y-%m-%d %H:%M:%S")
+info_col, reset_col = st.columns([5, 1])
+with info_col:
+    st.caption(f"Crawls run by this app since {since}. Batch runs from the command line are not included.")
+with reset_col:
+    if st.button("Reset"):
+        metrics.reset()
+        st.rerun()
+
+if not snap["stages"]:
+    st.info("Nothing recorded yet. Discover or scrape some pages from the Home page, then come back.")
+    st.stop()
+
+counters = snap["counters"]
+requests_made = int(counters.get("requests", 0))
+cache_hits = int(counters.get("cache_hits", 0))
+col1, col2, col3, col4 = st.columns(4)
+with col1:
+    st.metric("Requests", requests_made)
+with col2:
+    st.metric("Downloaded", f"{counters.get('bytes_fetched', 0) / 1_000_000:.1f} MB")
+with col3:
+    st.metric("Cache hits (304)", cache_hits, f"{cache_hits / requests_made:.0%} of requests" if requests_made else None,
+              delta_color="off")
+with col4:
+    st.metric("Failed requests", int(counters.get("errors", 0)))
+
+st.subheader("Latency by stage")
+stages = pd.DataFrame.from_dict(snap["stages"], orient="index")
+stages.index = [STAGE_LABELS.get(s, s) for s in stages.index]
+st.dataframe(stages.round(2), use_container_width=True,
+             column_config={"count": "Samples", "p50_ms": "p50 (ms)", "p95_ms": "p95 (ms)",
+                            "max_ms": "Max (ms)", "total_s": "Total (s)"})
+st.caption("Total seconds spent per stage")
+st.bar_chart(stages["total_s"])
+
+st.subheader("By host")
+hosts = pd.DataFrame(snap["hosts"])
+if hosts.empty:
+    st.caption("No per-host samples yet.")
+else:
+    # Hosts come most recently seen first; only the latest metrics.HOSTS_KEPT are retained at all.
+    recent_hosts = list(dict.fromkeys(hosts["host"]))
+    shown = st.number_input("Most recent hosts shown", min_value=1, max_value=metrics.HOSTS_KEPT,
+                            value=min(RECENT_HOSTS_SHOWN, len(recent_hosts)), step=5)
+    hosts = hosts[hosts["host"].isin(recent_hosts[:int(shown)])]
+    st.caption(f"{len(recent_hosts)} host(s) recorded; figures are kept for the {metrics.HOSTS_KEPT} most recently crawled.")
+    host_stages = sorted(hosts["stage"].unique())
+    stage = st.selectbox("Stage", host_stages, index=host_stages.index("fetch") if "fetch" in host_stages else 0,
+                         format_func=lambda s: STAGE_LABELS.get(s, s))
+    by_host = hosts[hosts["stage"] == stage].drop(columns="stage").set_index("host")
+    host_counters = pd.DataFrame(snap["host_counters"])
+    if not host_counters.empty:
+        by_host = by_host.join(host_counters.pivot(index="host", columns="name", values="value").fillna(0))
+    st.dataframe(by_host.sort_values("p95_ms", ascending=False).round(2), use_container_width=True)
+
+st.subheader("Slowest URLs")
+st.dataframe(pd.DataFrame(snap["slowest"]).round(1), use_container_width=True, hide_index=True,
+             column_config={"url": st.column_config.LinkColumn("URL"), "ms": "Time (ms)"})
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Same as the app entry points: import functions/ and db/ from the project root.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,62 @@
+import random
+
+from functions.contact_scan import ADDRESS, EMAIL, PHONE, count_digits, rank, scan_text
+from functions.extractor import collect_signals, parse_html
+from functions.scraper import _extract_contact
+
+WORDS = "lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor incididunt".split()
+
+
+def best(text: str, kind: str) -> str:
+    return next(c.value for c in rank(scan_text(text)) if c.kind == kind)
+
+
+def test_role_mailbox_outranks_personal_and_noreply():
+    assert best("Write to noreply@acme.com, jane@acme.com or info@acme.com", EMAIL) == "info@acme.com"
+
+
+def test_image_file_names_are_not_emails():
+    assert [c.value for c in scan_text("<img> logo@2x.png and hello@acme.io")] == ["hello@acme.io"]
+
+
+def test_uppercase_mailto_link_is_used():
+    signals = collect_signals(parse_html('<p>Hi</p><a href="MAILTO:Sales@Acme.com?subject=hi">Mail us</a>'))
+    assert _extract_contact(signals) == ("Sales@Acme.com", "", "")
+
+
+def test_labelled_phone_outranks_fax():
+    assert best("Fax: +1 212 555 0100 Tel: +1 212 555 0199", PHONE) == "+1 212 555 0199"
+
+
+def test_overlong_number_yields_no_phone():
+    assert scan_text("Tel 0049 30 1234567890123") == []
+
+
+def test_address_stops_before_lowercase_words_and_sentence_end():
+    assert best("Visit 12 Oak Street, Dayton OH 45402. Then left", ADDRESS) == "12 Oak Street, Dayton OH 45402"
+    assert best("Visit 12 Oak Street, dayton ohio today", ADDRESS) == "12 Oak Street"
+    assert best("Room 8888. Visit 12 Oak Street", ADDRESS) == "12 Oak Street"
+
+
+# Worst-case inputs from benchmarks/bench_contact_scan.py: beyond running in linear time, the
+# scanner must return only plausible, non-overlapping candidates on them.
+
+def test_digit_runs_give_only_valid_non_overlapping_phones():
+    rng = random.Random(1)
+    text = "".join(rng.choice("0123456789 ") for _ in range(64 * 1024))
+    found = scan_text(text)
+    assert found and {c.kind for c in found} == {PHONE}
+    assert all(10 <= count_digits(c.value) <= 15 for c in found)
+    assert all(a.end <= b.start for a, b in zip(found, found[1:]))
+    assert all(text[c.start:c.end] == c.value for c in found)
+
+
+def test_numbered_words_without_street_suffix_give_nothing():
+    rng = random.Random(1)
+    text = " ".join(f"{rng.randint(1, 999)} {rng.choice(WORDS)}" for _ in range(8000))
+    assert scan_text(text) == []
+
+
+def test_email_local_parts_without_at_give_nothing():
+    rng = random.Random(1)
+    assert scan_text("".join(rng.choice("abcdefghij.-_+") for _ in range(64 * 1024))) == []
@@ -0,0 +1,53 @@
+import io
+
+import pytest
+
+from db import database
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DB_PATH", tmp_path / "test.db")
+    database.init_db()
+    return database
+
+
+def _rows(db):
+    return [dict(r) for r in db.get_connection().execute(
+        "SELECT company_name, contact_phone, source_url, scraped_at FROM companies ORDER BY id")]
+
+
+def test_reimport_keeps_scraped_at_and_does_not_duplicate_rows_without_url(db):
+    db.upsert_companies([
+        {"company_name": "Acme", "source_url": "https://acme.test/contact", "scraped_at": "2024-05-01T00:00:00"},
+        {"company_name": "Typed in", "contact_phone": "555 0100", "source_url": ""},
+    ])
+    exported = io.BytesIO()
+    db.export_companies(exported, "csv")
+    stored = _rows(db)
+
+    for _ in range(2):
+        assert db.import_companies(io.BytesIO(exported.getvalue()), "csv") == 2
+    assert _rows(db) == stored
+
+
+def test_import_adds_new_rows_with_file_scraped_at(db):
+    data = ("company_name,source_url,scraped_at\n"
+            "Acme,https://acme.test/,2023-01-02T03:04:05\n"
+            "No URL,,2023-01-02T03:04:05\n"
+            "No URL,,2023-01-02T03:04:05\n")
+    assert db.import_companies(io.BytesIO(data.encode()), "csv") == 3
+    assert [(r["company_name"], r["scraped_at"]) for r in _rows(db)] == [
+        ("Acme", "2023-01-02T03:04:05"), ("No URL", "2023-01-02T03:04:05")]
+
+
+
+def test_search_without_word_characters_falls_back_to_substring_match(db):
+    db.upsert_companies([
+        {"company_name": "Acme", "contact_email": "info@acme.test", "source_url": "https://acme.test/"},
+        {"company_name": "Globex", "contact_phone": "+1 555 0100", "source_url": "https://globex.test/"},
+    ])
+    assert list(db.search_companies("@")["company_name"]) == ["Acme"]
+    assert list(db.search_companies("+")["company_name"]) == ["Globex"]
+    assert list(db.search_companies("acm")["company_name"]) == ["Acme"]
+    assert db.search_companies("  ").empty
@@ -0,0 +1,62 @@
+import sqlite3
+import threading
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from functions import fetcher, http_cache
+
+PAGE = b"<html><title>cached</title><body>hello</body></html>"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("ETag", '"v1"')
+        self.send_header("Content-Length", str(len(PAGE)))
+        self.end_headers()
+        self.wfile.write(PAGE)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def page_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/page"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def cache_path(tmp_path, monkeypatch):
+    path = tmp_path / "http_cache.db"
+    monkeypatch.setattr(http_cache, "CACHE_PATH", path)
+    monkeypatch.setattr(http_cache, "_local", threading.local())
+    return path
+
+
+def test_fetch_with_corrupt_cache_file_falls_back_to_network(page_url, cache_path, caplog):
+    cache_path.write_bytes(b"this is not a sqlite database" * 100)
+    for _ in range(2):
+        result = fetcher.fetch(page_url)
+        assert result.content == PAGE
+        assert not result.from_cache
+    assert "HTTP cache lookup failed" in caplog.text
+
+
+def test_fetch_with_corrupt_cached_body_refetches(page_url, cache_path):
+    fetcher.fetch(page_url)
+    conn = sqlite3.connect(cache_path)
+    with conn:
+        assert conn.execute("UPDATE responses SET body = ?", (b"not zlib",)).rowcount == 1
+    conn.close()
+    with pytest.raises(zlib.error):
+        http_cache.lookup(page_url)
+    result = fetcher.fetch(page_url)
+    assert result.content == PAGE
+    assert not result.from_cache
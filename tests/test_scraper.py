@@ -0,0 +1,40 @@
+import time
+
+import pytest
+
+from functions import scraper, sitemap
+
+
+def _frontier(urls):
+    frontier = scraper._Frontier()
+    for url in urls:
+        frontier.push(url)
+    return frontier
+
+
+def test_crawl_hands_over_pages_as_they_finish(monkeypatch):
+    def fetch_page(url, extract_contact=False, duplicates=None):
+        if url.endswith("/slow"):
+            time.sleep(0.5)
+        return scraper._Page(ok=True)
+
+    monkeypatch.setattr(scraper, "_fetch_page", fetch_page)
+    seen = []
+    scraper._crawl(_frontier(["http://t.test/slow", "http://t.test/a", "http://t.test/b"]), 3,
+                   sitemap.RobotsInfo([]), lambda url, page: seen.append(url) or True)
+    assert seen == ["http://t.test/a", "http://t.test/b", "http://t.test/slow"]
+
+
+def test_crawl_does_not_wait_for_other_fetches_when_on_page_raises(monkeypatch):
+    def fetch_page(url, extract_contact=False, duplicates=None):
+        time.sleep(1.0 if url.endswith("/slow") else 0.0)
+        return scraper._Page(ok=True)
+
+    def on_page(url, page):
+        raise RuntimeError("stop")
+
+    monkeypatch.setattr(scraper, "_fetch_page", fetch_page)
+    start = time.perf_counter()
+    with pytest.raises(RuntimeError):
+        scraper._crawl(_frontier(["http://t.test/slow", "http://t.test/a"]), 2, sitemap.RobotsInfo([]), on_page)
+    assert time.perf_counter() - start < 0.5